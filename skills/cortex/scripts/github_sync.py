@@ -5,12 +5,62 @@
 # ABOUTME: Syncs workout files to a GitHub repository using the GitHub API.
 # ABOUTME: Usage: uv run github_sync.py --file workouts.csv --dest workouts/workouts.csv
 
+from __future__ import annotations
+
 import argparse
 import base64
+import contextlib
+import functools
+import hashlib
+import io
 import json
+import os
 import sys
+import threading
+import time
 from pathlib import Path
 
+from warm import add_warm_arguments, begin_main, lazy_import, run_main, warm_socket
+
+API_URL = "https://api.github.com"
+
+# GitHub's secondary rate limits penalise bursts of concurrent requests, so
+# parallelism is capped well below its documented concurrency ceiling.
+MAX_JOBS = 10
+
+# Fetched files are cached here so repeat fetches can be conditional requests
+CACHE_DIR = Path(__file__).parent / ".cache"
+DEFAULT_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+# Failed and deferred pushes are journaled here (next to config.json) until --flush
+QUEUE_PATH = Path(__file__).parent / "queue.jsonl"
+
+# Files above this size skip the Contents API (which base64-encodes the whole
+# file into one JSON body and won't return content over 1 MB) and are streamed
+# through the Git Blobs API and the raw media type instead.
+LARGE_FILE_THRESHOLD = 1024 * 1024
+# Read size for streaming; a multiple of 3 so base64 chunks concatenate cleanly
+STREAM_CHUNK_SIZE = 3 * 64 * 1024
+
+# Retry/backoff policy for rate limits and transient server errors
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+# Rate-limit waits longer than this are not slept through; the request fails instead
+MAX_RATE_LIMIT_WAIT = 60.0
+# Below this many remaining requests, calls are spread over the reset window
+LOW_RATE_LIMIT_REMAINING = 50
+# After a secondary rate limit, space out writes as GitHub recommends
+WRITE_INTERVAL = 1.0
+# Attempts to re-read the remote sha/head and retry after a write conflict
+CONFLICT_RETRIES = 3
+
+# A --serve daemon listens here for --warm invocations
+WARM_SOCKET = warm_socket(__file__)
+
+# Per-request stats recorded by the session hook:
+# (method, url, status, seconds, bytes sent, bytes received)
+REQUEST_TIMINGS = []
+
 
 def load_config():
     """Load config from config.json in scripts directory."""
@@ -23,36 +73,529 @@ def load_config():
     return {}
 
 
-def get_file_info(repo: str, path: str, token: str, branch: str = "main") -> dict | None:
-    """Get file info (sha and content) from the repo, or None if it doesn't exist."""
-    import requests
+def record_timing(response, *args, **kwargs):
+    """Session response hook: record how long each request took and its payload sizes."""
+    request = response.request
+    if isinstance(request.body, (bytes, str)):
+        sent = len(request.body)
+    else:
+        # Streamed bodies (BlobBody) declare their length up front
+        sent = int(request.headers.get("Content-Length", 0))
+    if kwargs.get("stream"):
+        # Don't consume a streamed body here; trust the declared length
+        received = int(response.headers.get("Content-Length", 0))
+    else:
+        received = len(response.content)
+    REQUEST_TIMINGS.append(
+        (request.method, request.url, response.status_code,
+         response.elapsed.total_seconds(), sent, received)
+    )
+
+
+def transferred_since(start: int) -> tuple[int, int]:
+    """Bytes (sent, received) by requests recorded after REQUEST_TIMINGS[start]."""
+    timings = REQUEST_TIMINGS[start:]
+    return sum(t[4] for t in timings), sum(t[5] for t in timings)
+
+
+class RequestScheduler:
+    """Paces GitHub API requests and retries rate-limited or failed ones.
+
+    Every response's X-RateLimit-Remaining/X-RateLimit-Reset headers are
+    tracked; when the budget runs low, requests are spread evenly over the
+    time left until reset. 429s and rate-limit 403s are retried after
+    Retry-After (or the reset time), 5xx errors after a jittered
+    exponential backoff. Once a secondary rate limit has been hit, writes
+    are spaced WRITE_INTERVAL apart for the rest of the run.
+    """
+
+    WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, retries: int = 3):
+        self.retries = retries
+        self.lock = threading.Lock()
+        self.next_request = 0.0
+        self.next_write = 0.0
+        self.write_interval = 0.0
+
+    def request(self, send, method: str, url: str, **kwargs):
+        """Send a request through `send` (Session.request), pacing and retrying it."""
+        is_write = method.upper() in self.WRITE_METHODS
+        for attempt in range(self.retries + 1):
+            self._wait(is_write)
+            response = send(method, url, **kwargs)
+            delay = self._update(response, attempt)
+            if delay is None or attempt == self.retries:
+                return response
+            response.close()
+            time.sleep(delay)
+        return response
+
+    def _wait(self, is_write: bool) -> None:
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request)
+            if is_write:
+                start = max(start, self.next_write)
+                self.next_write = start + self.write_interval
+        delay = start - now
+        # Spacing can exceed the cap when few requests are left and the reset
+        # is far off; still pause the longest allowed rather than not at all
+        if delay > 0:
+            time.sleep(min(delay, MAX_RATE_LIMIT_WAIT))
+
+    def _update(self, response, attempt: int) -> float | None:
+        """Record rate-limit headers; return a retry delay, or None to not retry."""
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        until_reset = max(0.0, float(reset) - time.time()) if reset else 0.0
+
+        with self.lock:
+            if remaining is not None and reset and int(remaining) < LOW_RATE_LIMIT_REMAINING:
+                spacing = until_reset / max(int(remaining), 1)
+                self.next_request = max(self.next_request, time.monotonic() + spacing)
+
+        status = response.status_code
+        rate_limited = status == 429 or (
+            status == 403
+            and (remaining == "0" or "Retry-After" in headers or "rate limit" in response.text.lower())
+        )
+        if rate_limited:
+            with self.lock:
+                self.write_interval = WRITE_INTERVAL
+            retry_after = self._retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = retry_after
+            elif remaining == "0":
+                delay = until_reset
+            else:
+                delay = self._backoff(attempt)
+            return delay if delay <= MAX_RATE_LIMIT_WAIT else None
+        if status in (500, 502, 503, 504):
+            return self._backoff(attempt)
+        return None
+
+    @staticmethod
+    def _retry_after(value: str | None) -> float | None:
+        """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        import random
+
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def make_session(pool_size: int = 10, retries: int = 3):
+    """Create a pooled keep-alive session for GitHub API requests.
+
+    Reusing one session means only the first request pays for the TCP+TLS
+    handshake. Connection errors are retried by urllib3; rate limits and
+    server errors are handled by a RequestScheduler wrapped around the
+    session's requests.
+    """
+    requests = lazy_import("requests")
+    from urllib3.util.retry import Retry
+
+    retry = Retry(total=retries, status=0, backoff_factor=0.5, raise_on_status=False)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(record_timing)
+    session.request = functools.partial(RequestScheduler(retries).request, session.request)
+    return session
+
+
+_sessions = {}
+
+
+def get_session(pool_size: int = 10, retries: int = 3):
+    """Return the shared session for these settings, creating it on first use.
+
+    A warm daemon keeps its sessions, so later invocations reuse open
+    connections as well as the imported modules.
+    """
+    key = (pool_size, retries)
+    if key not in _sessions:
+        _sessions[key] = make_session(pool_size, retries)
+    return _sessions[key]
+
+
+def print_timings() -> None:
+    """Print per-request timings recorded during this run to stderr."""
+    if not REQUEST_TIMINGS:
+        return
+    print("\nRequest timings:", file=sys.stderr)
+    for method, url, status, seconds, sent, received in REQUEST_TIMINGS:
+        path = url.split("?", 1)[0].replace(API_URL, "")
+        print(
+            f"  {seconds * 1000:8.1f} ms  {sent:>9} B up  {received:>9} B down  {status}  {method} {path}",
+            file=sys.stderr,
+        )
+    total = sum(t[3] for t in REQUEST_TIMINGS)
+    sent, received = transferred_since(0)
+    print(
+        f"  {total * 1000:8.1f} ms  {sent:>9} B up  {received:>9} B down  total ({len(REQUEST_TIMINGS)} requests)",
+        file=sys.stderr,
+    )
+
+
+def map_concurrent(func, items: list, jobs: int = 1) -> list:
+    """Apply func to each item using up to `jobs` threads.
+
+    Results are returned in the same order as `items`, so output stays
+    stable regardless of which request finishes first.
+    """
+    jobs = max(1, min(jobs, MAX_JOBS, len(items)))
+    if jobs == 1:
+        return [func(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items))
+
+
+class FileCache:
+    """On-disk LRU cache of fetched files, keyed by repo/branch/path.
+
+    Each entry stores the file's ETag, sha and content in its own JSON file.
+    Entries are touched on every hit, and the least recently used ones are
+    evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    def _entry_path(self, repo: str, branch: str, path: str) -> Path:
+        key = f"{repo}\0{branch}\0{path}".encode("utf-8")
+        return self.directory / f"{hashlib.sha256(key).hexdigest()}.json"
+
+    def get(self, repo: str, branch: str, path: str) -> dict | None:
+        """Return the cached entry ({etag, sha, content}) or None."""
+        entry_path = self._entry_path(repo, branch, path)
+        try:
+            with open(entry_path) as f:
+                entry = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, repo: str, branch: str, path: str, etag: str | None, sha: str, content: str) -> None:
+        """Store an entry, then evict old entries if over the size cap."""
+        data = json.dumps({"etag": etag, "sha": sha, "content": content})
+        if len(data) > self.max_bytes:
+            return
+        entry_path = self._entry_path(repo, branch, path)
+        with self.lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(".tmp")
+            tmp_path.write_text(data)
+            os.replace(tmp_path, entry_path)
+            self._evict()
+
+    def delete(self, repo: str, branch: str, path: str) -> None:
+        """Drop the entry for a file that no longer exists remotely."""
+        self._entry_path(repo, branch, path).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        entries = []
+        for entry_path in self.directory.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry_path.unlink(missing_ok=True)
+            total -= size
+
+
+class PushQueue:
+    """Append-only journal of pushes waiting to be sent.
+
+    Each line records one write (repo, branch, dest path, message), or an
+    append when it is flagged as one. The file's content is snapshotted
+    into a content-addressed directory next to the journal, so queued
+    writes survive the original temp file being deleted or overwritten.
+    Pending writes to the same path coalesce to the most recent one;
+    appends after it are kept, in order. add and clear hold an exclusive
+    lock on a .lock file next to the journal, so a --defer during a --flush
+    is neither dropped from the journal nor left without its snapshot.
+    """
+
+    def __init__(self, path: Path = QUEUE_PATH):
+        self.path = Path(path)
+        self.blob_dir = self.path.with_suffix("")
+        self.lock_path = self.path.with_suffix(".lock")
+
+    @contextlib.contextmanager
+    def _locked(self):
+        try:
+            import fcntl
+        except ImportError:
+            # No flock (Windows): concurrent runs are not guarded
+            yield
+            return
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add(
+        self, repo: str, branch: str, local_path: str, dest_path: str, message: str, append: bool = False
+    ) -> None:
+        """Snapshot a local file and append a pending write (or append) for it."""
+        import shutil
+
+        local_file = Path(local_path)
+        blob = git_blob_sha_file(local_file)
+        record = {
+            "time": time.time(),
+            "repo": repo,
+            "branch": branch,
+            "dest": dest_path,
+            "blob": blob,
+            "message": message,
+        }
+        if append:
+            record["append"] = True
+        with self._locked():
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            snapshot = self.blob_dir / blob
+            if not snapshot.exists():
+                shutil.copyfile(local_file, snapshot)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _records(self) -> list[dict]:
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+        return records
+
+    def pending(self, repo: str, branch: str) -> list[dict]:
+        """Pending writes for a repo/branch: per path, the latest write and any appends after it."""
+        latest = {}
+        for record in self._records():
+            if record["repo"] == repo and record["branch"] == branch:
+                if record.get("append"):
+                    latest.setdefault(record["dest"], []).append(record)
+                else:
+                    latest[record["dest"]] = [record]
+        return [record for records in latest.values() for record in records]
+
+    def snapshot_path(self, record: dict) -> Path:
+        return self.blob_dir / record["blob"]
 
-    url = f"https://api.github.com/repos/{repo}/contents/{path}"
-    headers = {
+    def clear(self, repo: str, branch: str, flushed: list[dict]) -> None:
+        """Drop writes superseded by a successful flush and unused snapshots."""
+        flushed_until = {}
+        for record in flushed:
+            flushed_until[record["dest"]] = max(record["time"], flushed_until.get(record["dest"], -1))
+
+        # Re-read under the lock so records added since pending() are kept
+        with self._locked():
+            keep = [
+                record for record in self._records()
+                if not (
+                    record["repo"] == repo
+                    and record["branch"] == branch
+                    and record["time"] <= flushed_until.get(record["dest"], -1)
+                )
+            ]
+
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                for record in keep:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, self.path)
+
+            in_use = {record["blob"] for record in keep}
+            for snapshot in self.blob_dir.glob("*"):
+                if snapshot.name not in in_use:
+                    snapshot.unlink(missing_ok=True)
+
+
+def git_blob_sha(content: bytes) -> str:
+    """Compute the git blob SHA-1 of content, as GitHub reports it for files."""
+    header = f"blob {len(content)}\0".encode("utf-8")
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def git_blob_sha_file(path: Path) -> str:
+    """Compute the git blob SHA-1 of a file without reading it all into memory."""
+    digest = hashlib.sha1(f"blob {path.stat().st_size}\0".encode("utf-8"))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobBody:
+    """Blobs API JSON body for a file, base64-encoded chunk by chunk.
+
+    Iterating re-reads the file from the start, so a retried request can
+    send the body again. The encoded length is known from the file size, so
+    requests sends a Content-Length instead of a chunked body.
+    """
+
+    HEAD = b'{"encoding": "base64", "content": "'
+    TAIL = b'"}'
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __len__(self) -> int:
+        size = self.path.stat().st_size
+        return len(self.HEAD) + 4 * ((size + 2) // 3) + len(self.TAIL)
+
+    def __iter__(self):
+        yield self.HEAD
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b""):
+                yield base64.b64encode(chunk)
+        yield self.TAIL
+
+
+def api_headers(token: str) -> dict:
+    """Build the standard GitHub API request headers."""
+    return {
         "Authorization": f"Bearer {token}",
         "Accept": "application/vnd.github.v3+json",
     }
+
+
+def print_api_error(label: str, response) -> None:
+    """Print a GitHub API error response to stderr."""
+    print(f"Error {label}: {response.status_code}", file=sys.stderr)
+    try:
+        message = response.json().get("message", "Unknown error")
+    except ValueError:
+        message = "Unknown error"
+    print(message, file=sys.stderr)
+
+
+def get_file_info(
+    repo: str, path: str, token: str, branch: str = "main", session=None, cache=None
+) -> dict | None:
+    """Get file info (sha, size and content) from the repo, or None if it doesn't exist.
+
+    Content is None for files the Contents API won't inline (over 1 MB) and
+    for files that aren't UTF-8 text; use download_file for those.
+
+    With a cache, the request is conditional on the cached ETag; a 304
+    reply is served from the cache and does not count against the rate
+    limit.
+    """
+    session = session or get_session()
+
+    url = f"{API_URL}/repos/{repo}/contents/{path}"
+    headers = api_headers(token)
     params = {"ref": branch}
 
-    response = requests.get(url, headers=headers, params=params)
+    cached = cache.get(repo, branch, path) if cache else None
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    response = session.get(url, headers=headers, params=params)
+    if response.status_code == 304 and cached:
+        content = cached["content"]
+        return {"sha": cached["sha"], "size": len(content.encode("utf-8")), "content": content}
     if response.status_code == 200:
         data = response.json()
-        content_b64 = data.get("content", "")
-        content = base64.b64decode(content_b64).decode("utf-8") if content_b64 else ""
-        return {"sha": data.get("sha"), "content": content}
+        content = None
+        if data.get("encoding") != "none":
+            content_b64 = data.get("content", "")
+            try:
+                content = base64.b64decode(content_b64).decode("utf-8") if content_b64 else ""
+            except UnicodeDecodeError:
+                content = None
+        if cache and content is not None:
+            cache.put(repo, branch, path, response.headers.get("ETag"), data.get("sha"), content)
+        return {"sha": data.get("sha"), "size": data.get("size"), "content": content}
+    if response.status_code == 404 and cache:
+        cache.delete(repo, branch, path)
     return None
 
 
-def get_file_sha(repo: str, path: str, token: str, branch: str = "main") -> str | None:
+def get_file_sha(
+    repo: str, path: str, token: str, branch: str = "main", session=None, cache=None
+) -> str | None:
     """Get the SHA of an existing file in the repo, or None if it doesn't exist."""
-    info = get_file_info(repo, path, token, branch)
+    info = get_file_info(repo, path, token, branch, session, cache)
     return info["sha"] if info else None
 
 
-def fetch_file(repo: str, path: str, token: str, branch: str = "main") -> str | None:
+def fetch_file(
+    repo: str, path: str, token: str, branch: str = "main", session=None, cache=None
+) -> str | None:
     """Fetch file content from GitHub repo. Returns content string or None if not found."""
-    info = get_file_info(repo, path, token, branch)
-    return info["content"] if info else None
+    info = get_file_info(repo, path, token, branch, session, cache)
+    if info is None:
+        return None
+    if info["content"] is None:
+        buffer = io.BytesIO()
+        if not download_file(repo, path, token, buffer, branch, session):
+            return None
+        return buffer.getvalue().decode("utf-8", errors="replace")
+    return info["content"]
+
+
+def download_file(
+    repo: str, path: str, token: str, out, branch: str = "main", session=None
+) -> bool:
+    """Stream a file's raw bytes into the binary file object `out`.
+
+    Uses the raw media type, which works for files up to 100 MB and keeps
+    memory use bounded by the chunk size rather than the file size.
+    """
+    session = session or get_session()
+
+    url = f"{API_URL}/repos/{repo}/contents/{path}"
+    headers = api_headers(token)
+    headers["Accept"] = "application/vnd.github.raw"
+
+    with session.get(url, headers=headers, params={"ref": branch}, stream=True) as response:
+        if response.status_code != 200:
+            print_api_error(f"downloading {path}", response)
+            return False
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            out.write(chunk)
+    return True
 
 
 def push_file(
@@ -62,45 +605,317 @@ def push_file(
     dest_path: str,
     message: str,
     branch: str = "main",
+    session=None,
+    cache=None,
 ) -> bool:
     """Push a single file to GitHub using the Contents API."""
-    import requests
+    session = session or get_session()
+
+    if not Path(local_path).exists():
+        print(f"Error: Local file not found: {local_path}", file=sys.stderr)
+        return False
+
+    sha = get_file_sha(repo, dest_path, token, branch, session, cache)
+    return put_file(repo, token, local_path, dest_path, message, branch, sha, session, cache)
+
+
+def put_file(
+    repo: str,
+    token: str,
+    local_path: str,
+    dest_path: str,
+    message: str,
+    branch: str,
+    sha: str | None,
+    session=None,
+    cache=None,
+) -> bool:
+    """Upload a file with the Contents API, given the remote sha it replaces (if any)."""
+    session = session or get_session()
 
     local_file = Path(local_path)
     if not local_file.exists():
         print(f"Error: Local file not found: {local_path}", file=sys.stderr)
         return False
 
+    local_sha = git_blob_sha_file(local_file)
+    if sha and sha == local_sha:
+        print(f"Unchanged: https://github.com/{repo}/blob/{branch}/{dest_path}")
+        return True
+
+    if local_file.stat().st_size > LARGE_FILE_THRESHOLD:
+        result = commit_files(
+            repo, token, [(local_path, dest_path)], message, branch, session, cache
+        )
+        if result is not None:
+            return result
+
     content = local_file.read_bytes()
     content_b64 = base64.b64encode(content).decode("utf-8")
 
-    url = f"https://api.github.com/repos/{repo}/contents/{dest_path}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
+    url = f"{API_URL}/repos/{repo}/contents/{dest_path}"
+    headers = api_headers(token)
 
-    data = {
-        "message": message,
-        "content": content_b64,
-        "branch": branch,
-    }
+    for _ in range(CONFLICT_RETRIES + 1):
+        data = {
+            "message": message,
+            "content": content_b64,
+            "branch": branch,
+        }
 
-    sha = get_file_sha(repo, dest_path, token, branch)
-    if sha:
-        data["sha"] = sha
+        if sha:
+            data["sha"] = sha
 
-    response = requests.put(url, headers=headers, json=data)
+        response = session.put(url, headers=headers, json=data)
+        # 409/422: the branch or file moved since the sha was read; re-read it
+        if response.status_code not in (409, 422):
+            break
+        sha = get_file_sha(repo, dest_path, token, branch, session, cache)
+        if sha == local_sha:
+            print(f"Unchanged: https://github.com/{repo}/blob/{branch}/{dest_path}")
+            return True
 
     if response.status_code in (200, 201):
+        if cache:
+            cache.delete(repo, branch, dest_path)
         action = "Updated" if sha else "Created"
         print(f"{action}: https://github.com/{repo}/blob/{branch}/{dest_path}")
         return True
     else:
-        print(f"Error pushing {dest_path}: {response.status_code}", file=sys.stderr)
-        print(response.json().get("message", "Unknown error"), file=sys.stderr)
+        print_api_error(f"pushing {dest_path}", response)
+        return False
+
+
+def append_section(content: str, section: str) -> str:
+    """Append a section to file content, starting it on a fresh line."""
+    if content and not content.endswith("\n"):
+        content += "\n"
+    return content + section
+
+
+def append_file(
+    repo: str,
+    token: str,
+    local_path: str,
+    dest_path: str,
+    message: str,
+    branch: str = "main",
+    session=None,
+    cache=None,
+) -> bool:
+    """Append the contents of local_path to dest_path in the repo.
+
+    The remote file is read from the cache when there is an entry, so a
+    repeat append is a single PUT carrying the cached sha. If the file moved
+    on remotely (409/422), it is re-fetched and merged three ways: whatever
+    the other writer did is kept and our section is appended after it, unless
+    the remote already starts with our result (an earlier attempt landed,
+    possibly followed by someone else's append).
+    """
+    session = session or get_session()
+
+    local_file = Path(local_path)
+    if not local_file.exists():
+        print(f"Error: Local file not found: {local_path}", file=sys.stderr)
+        return False
+    section = local_file.read_text()
+
+    start = len(REQUEST_TIMINGS)
+    base = cache.get(repo, branch, dest_path) if cache else None
+    if base is None:
+        base = get_file_info(repo, dest_path, token, branch, session, cache)
+    url = f"{API_URL}/repos/{repo}/contents/{dest_path}"
+
+    for attempt in range(CONFLICT_RETRIES + 1):
+        if base is not None and base["content"] is None:
+            print(f"Error: Can't append to {dest_path}: not a text file under 1 MB", file=sys.stderr)
+            return False
+        base_content = base["content"] if base else ""
+        content = append_section(base_content, section)
+
+        data = {
+            "message": message,
+            "content": base64.b64encode(content.encode("utf-8")).decode("utf-8"),
+            "branch": branch,
+        }
+        if base:
+            data["sha"] = base["sha"]
+
+        response = session.put(url, headers=api_headers(token), json=data)
+        if response.status_code not in (409, 422) or attempt == CONFLICT_RETRIES:
+            break
+
+        # Someone else wrote the file: merge our section onto their version
+        latest = get_file_info(repo, dest_path, token, branch, session, cache)
+        if latest is not None and latest["content"] is not None and latest["content"].startswith(content):
+            response = None
+            break
+        base = latest
+
+    if response is not None and response.status_code not in (200, 201):
+        print_api_error(f"appending to {dest_path}", response)
         return False
 
+    if cache and response is not None:
+        new_sha = response.json()["content"]["sha"]
+        cache.put(repo, branch, dest_path, None, new_sha, content)
+
+    sent, received = transferred_since(start)
+    print(
+        f"Appended: https://github.com/{repo}/blob/{branch}/{dest_path} "
+        f"({len(section.encode('utf-8'))} B appended, {sent} B sent, {received} B received)"
+    )
+    return True
+
+
+def get_branch_head(
+    repo: str, token: str, branch: str = "main", session=None
+) -> tuple[str, str] | bool | None:
+    """Return (commit sha, tree sha) for the head of a branch.
+
+    Returns None if the branch has no commits yet (e.g. an empty repo) and
+    False if the lookup failed.
+    """
+    session = session or get_session()
+    headers = api_headers(token)
+    git_url = f"{API_URL}/repos/{repo}/git"
+
+    response = session.get(f"{git_url}/ref/heads/{branch}", headers=headers)
+    if response.status_code in (404, 409):
+        return None
+    if response.status_code != 200:
+        print_api_error(f"reading branch {branch}", response)
+        return False
+    head_sha = response.json()["object"]["sha"]
+
+    response = session.get(f"{git_url}/commits/{head_sha}", headers=headers)
+    if response.status_code != 200:
+        print_api_error(f"reading commit {head_sha}", response)
+        return False
+    return head_sha, response.json()["tree"]["sha"]
+
+
+def commit_files(
+    repo: str,
+    token: str,
+    files: list[tuple[str, str]],
+    message: str,
+    branch: str = "main",
+    session=None,
+    cache=None,
+    deletes: list[str] | None = None,
+    head: tuple[str, str] | None = None,
+) -> bool | None:
+    """Push multiple files as a single commit using the Git Data API.
+
+    Builds one tree on top of the branch head, commits it and moves the
+    branch ref, so the push is atomic and costs a fixed number of requests
+    regardless of how many files are included. Small text files are sent
+    inline in the tree; binary files are uploaded as blobs first, and files
+    over LARGE_FILE_THRESHOLD are streamed to the Blobs API from disk.
+    Paths in `deletes` are removed in the same commit. Pass `head` (from
+    get_branch_head) to skip looking the branch up again.
+
+    Returns None if the branch has no head to build on (e.g. an empty repo),
+    so the caller can fall back to the Contents API.
+    """
+    session = session or get_session()
+    headers = api_headers(token)
+    git_url = f"{API_URL}/repos/{repo}/git"
+
+    entries = []
+    for local_path, dest_path in files:
+        local_file = Path(local_path)
+        if not local_file.exists():
+            print(f"Error: Local file not found: {local_path}", file=sys.stderr)
+            return False
+        entries.append((local_file, dest_path))
+
+    head = head or get_branch_head(repo, token, branch, session)
+    if not head:
+        return head
+    head_sha, base_tree = head
+
+    deletes = deletes or []
+    tree = [{"path": path, "mode": "100644", "type": "blob", "sha": None} for path in deletes]
+    for local_file, dest_path in entries:
+        entry = {"path": dest_path, "mode": "100644", "type": "blob"}
+        content = None
+        if local_file.stat().st_size <= LARGE_FILE_THRESHOLD:
+            try:
+                content = local_file.read_bytes().decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+
+        if content is not None:
+            entry["content"] = content
+        else:
+            response = session.post(
+                f"{git_url}/blobs",
+                headers={**headers, "Content-Type": "application/json"},
+                data=BlobBody(local_file),
+            )
+            if response.status_code != 201:
+                print_api_error(f"uploading {dest_path}", response)
+                return False
+            entry["sha"] = response.json()["sha"]
+        tree.append(entry)
+
+    # If the branch moves between reading its head and updating the ref, the
+    # update is rejected as a non-fast-forward; rebuild on the new head.
+    for attempt in range(CONFLICT_RETRIES + 1):
+        response = session.post(
+            f"{git_url}/trees",
+            headers=headers,
+            json={"base_tree": base_tree, "tree": tree},
+        )
+        if response.status_code != 201:
+            print_api_error("creating tree", response)
+            return False
+        tree_sha = response.json()["sha"]
+
+        # Identical content produces an identical tree; skip the empty commit
+        if tree_sha == base_tree:
+            for _, dest_path in entries:
+                print(f"Unchanged: https://github.com/{repo}/blob/{branch}/{dest_path}")
+            return True
+
+        response = session.post(
+            f"{git_url}/commits",
+            headers=headers,
+            json={"message": message, "tree": tree_sha, "parents": [head_sha]},
+        )
+        if response.status_code != 201:
+            print_api_error("creating commit", response)
+            return False
+        commit_sha = response.json()["sha"]
+
+        response = session.patch(
+            f"{git_url}/refs/heads/{branch}",
+            headers=headers,
+            json={"sha": commit_sha},
+        )
+        if response.status_code == 200:
+            break
+        if response.status_code not in (409, 422) or attempt == CONFLICT_RETRIES:
+            print_api_error(f"updating branch {branch}", response)
+            return False
+        head = get_branch_head(repo, token, branch, session)
+        if not head:
+            return False
+        head_sha, base_tree = head
+
+    if cache:
+        for path in [dest_path for _, dest_path in entries] + deletes:
+            cache.delete(repo, branch, path)
+
+    for _, dest_path in entries:
+        print(f"Committed: https://github.com/{repo}/blob/{branch}/{dest_path}")
+    for path in deletes:
+        print(f"Deleted: {path}")
+    print(f"Commit: https://github.com/{repo}/commit/{commit_sha}")
+    return True
+
 
 def push_files(
     repo: str,
@@ -108,16 +923,209 @@ def push_files(
     files: list[tuple[str, str]],
     message: str,
     branch: str = "main",
+    batch: bool = True,
+    session=None,
+    jobs: int = 1,
+    cache=None,
 ) -> bool:
-    """Push multiple files to GitHub."""
+    """Push multiple files to GitHub.
+
+    With batch=True (and more than one file) all files land in a single
+    commit via the Git Data API. Otherwise, or if the branch has no commits
+    yet, each file is pushed with its own Contents API request: the sha
+    lookups run concurrently (up to `jobs` at a time) while the uploads stay
+    serial, since concurrent commits to one branch conflict and GitHub asks
+    for content-creating requests to be made one at a time.
+    """
+    session = session or get_session()
+    if batch and len(files) > 1:
+        result = commit_files(repo, token, files, message, branch, session, cache)
+        if result is not None:
+            return result
+
+    shas = map_concurrent(
+        lambda item: get_file_sha(repo, item[1], token, branch, session, cache), files, jobs
+    )
+
     success = True
-    for local_path, dest_path in files:
-        if not push_file(repo, token, local_path, dest_path, message, branch):
+    for (local_path, dest_path), sha in zip(files, shas):
+        if not put_file(
+            repo, token, local_path, dest_path, message, branch, sha, session, cache
+        ):
             success = False
     return success
 
 
-def main():
+def flush_queue(
+    repo: str,
+    token: str,
+    queue: PushQueue,
+    branch: str = "main",
+    session=None,
+    cache=None,
+) -> bool:
+    """Push every pending write in the queue as one batched commit.
+
+    Queued appends are then replayed in order with append_file, after the
+    write (if any) they were queued on top of. An append that fails stays
+    queued along with any later appends to the same path.
+    """
+    records = queue.pending(repo, branch)
+    if not records:
+        print("Queue is empty")
+        return True
+
+    writes = [record for record in records if not record.get("append")]
+    appends = [record for record in records if record.get("append")]
+
+    if writes:
+        messages = list(dict.fromkeys(record["message"] for record in writes))
+        if len(messages) == 1:
+            message = messages[0]
+        else:
+            message = f"Sync {len(writes)} queued files\n\n" + "\n".join(f"- {m}" for m in messages)
+
+        files = [(str(queue.snapshot_path(record)), record["dest"]) for record in writes]
+        if not push_files(repo, token, files, message, branch, session=session, cache=cache):
+            print("Flush failed; writes remain queued", file=sys.stderr)
+            return False
+
+    flushed = list(writes)
+    failed = set()
+    for record in appends:
+        if record["dest"] in failed:
+            continue
+        if append_file(
+            repo, token, str(queue.snapshot_path(record)), record["dest"], record["message"],
+            branch, session, cache,
+        ):
+            flushed.append(record)
+        else:
+            failed.add(record["dest"])
+    queue.clear(repo, branch, flushed)
+    if failed:
+        print(f"Flush failed for {len(failed)} append(s); they remain queued", file=sys.stderr)
+        return False
+    return True
+
+
+def is_hidden(relative_path: str) -> bool:
+    """True for paths with a dotfile or dot-directory component (.git, .obsidian, ...)."""
+    return any(part.startswith(".") for part in relative_path.split("/"))
+
+
+def list_remote_tree(
+    repo: str, token: str, tree_sha: str, prefix: str, session=None
+) -> dict[str, str] | None:
+    """Map path (relative to prefix) -> blob sha for every file under prefix.
+
+    Uses a single recursive Trees API request for the whole repo.
+    """
+    session = session or get_session()
+    response = session.get(
+        f"{API_URL}/repos/{repo}/git/trees/{tree_sha}",
+        headers=api_headers(token),
+        params={"recursive": "1"},
+    )
+    if response.status_code != 200:
+        print_api_error("listing remote tree", response)
+        return None
+    data = response.json()
+    if data.get("truncated"):
+        print("Error: Remote tree is too large to list in one request", file=sys.stderr)
+        return None
+
+    remote = {}
+    for item in data.get("tree", []):
+        if item["type"] != "blob":
+            continue
+        path = item["path"]
+        if prefix:
+            if not path.startswith(prefix + "/"):
+                continue
+            path = path[len(prefix) + 1:]
+        remote[path] = item["sha"]
+    return remote
+
+
+def sync_dir(
+    repo: str,
+    token: str,
+    local_dir: str,
+    remote_dir: str,
+    message: str,
+    branch: str = "main",
+    session=None,
+    cache=None,
+    delete: bool = True,
+    dry_run: bool = False,
+) -> bool:
+    """Make remote_dir match local_dir, pushing only the difference in one commit.
+
+    The remote side is read with one recursive tree listing and compared
+    against git blob hashes of the local files, so unchanged files cost no
+    requests at all. Files missing locally are deleted remotely unless
+    delete=False. Hidden files and directories are ignored on both sides.
+    """
+    session = session or get_session()
+    local_root = Path(local_dir)
+    if not local_root.is_dir():
+        print(f"Error: Local directory not found: {local_dir}", file=sys.stderr)
+        return False
+    prefix = remote_dir.strip("/")
+
+    local = {}
+    for local_file in sorted(local_root.rglob("*")):
+        relative = local_file.relative_to(local_root).as_posix()
+        if local_file.is_file() and not is_hidden(relative):
+            local[relative] = local_file
+
+    def remote_path(relative: str) -> str:
+        return f"{prefix}/{relative}" if prefix else relative
+
+    head = get_branch_head(repo, token, branch, session)
+    if head is False:
+        return False
+    if head is None:
+        # Nothing to diff against yet: every local file is new
+        files = [(str(local_file), remote_path(rel)) for rel, local_file in local.items()]
+        if dry_run:
+            for _, dest_path in files:
+                print(f"Add: {dest_path}")
+            return True
+        return push_files(repo, token, files, message, branch, batch=False, session=session, cache=cache)
+
+    remote = list_remote_tree(repo, token, head[1], prefix, session)
+    if remote is None:
+        return False
+    remote = {path: sha for path, sha in remote.items() if not is_hidden(path)}
+
+    added = [rel for rel in local if rel not in remote]
+    changed = [
+        rel for rel in local
+        if rel in remote and git_blob_sha_file(local[rel]) != remote[rel]
+    ]
+    deleted = sorted(rel for rel in remote if rel not in local) if delete else []
+
+    for label, paths in (("Add", added), ("Change", changed), ("Delete", deleted)):
+        for rel in paths:
+            print(f"{label}: {remote_path(rel)}")
+    if not (added or changed or deleted):
+        print(f"Up to date: {len(local)} files in {prefix or '/'}")
+        return True
+    if dry_run:
+        return True
+
+    files = [(str(local[rel]), remote_path(rel)) for rel in sorted(added + changed)]
+    deletes = [remote_path(rel) for rel in deleted]
+    return bool(commit_files(
+        repo, token, files, message, branch, session, cache, deletes=deletes, head=head
+    ))
+
+
+def main(argv: list[str] | None = None, startup_ms: float | None = None):
+    argv, startup_ms = begin_main(argv, startup_ms, WARM_SOCKET)
+
     config = load_config()
 
     parser = argparse.ArgumentParser(
@@ -140,8 +1148,10 @@ def main():
     )
     parser.add_argument(
         "--fetch",
+        action="append",
+        dest="fetches",
         metavar="PATH",
-        help="Fetch a file from the repo and print to stdout"
+        help="Fetch a file from the repo and print to stdout (can specify multiple)"
     )
     parser.add_argument(
         "--file",
@@ -155,14 +1165,98 @@ def main():
         dest="dests",
         help="Destination path in repo (can specify multiple)"
     )
+    parser.add_argument(
+        "--sync-dir",
+        metavar="LOCAL:REMOTE",
+        help="Make a repo directory match a local directory, pushing only the changes in one commit"
+    )
+    parser.add_argument(
+        "--no-delete",
+        action="store_true",
+        help="With --sync-dir, keep remote files that don't exist locally"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --sync-dir, list the changes without pushing them"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Append each --file to its --dest instead of replacing it, merging with concurrent edits"
+    )
+    parser.add_argument(
+        "--defer",
+        action="store_true",
+        help="Queue the --file pushes locally instead of pushing now (send later with --flush)"
+    )
+    parser.add_argument(
+        "--flush",
+        action="store_true",
+        help="Push all queued writes in one commit, keeping only the latest write per path"
+    )
     parser.add_argument(
         "--message", "-m",
         default="Update workout files",
         help="Commit message"
     )
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="Push each file as its own commit via the Contents API"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=config.get("http_pool_size", 10),
+        help="Max pooled connections to the GitHub API (default: from config.json or 10)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=config.get("http_retries", 3),
+        help="Retries for connection errors, rate limits and 5xx responses (default: from config.json or 3)"
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Print per-request timings to stderr"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=config.get("concurrency", 4),
+        help=f"Max concurrent requests, capped at {MAX_JOBS} (default: from config.json or 4)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't use or update the local fetch cache"
+    )
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=config.get("cache_max_bytes", DEFAULT_CACHE_MAX_BYTES),
+        help="Size cap for the fetch cache before LRU eviction (default: from config.json or 20 MB)"
+    )
+    add_warm_arguments(parser)
+
+    args = parser.parse_args(argv)
+    run_main(run_timed, args, main, startup_ms, WARM_SOCKET, get_session)
 
-    args = parser.parse_args()
 
+def run_timed(args):
+    """run(), then print per-request timings for --timing."""
+    REQUEST_TIMINGS.clear()
+    try:
+        run(args)
+    finally:
+        if args.timing:
+            print_timings()
+
+
+def run(args):
+    """Carry out the mode selected on the command line."""
     if not args.token:
         print("Error: No GitHub token provided. Set github_token in config.json or use --token", file=sys.stderr)
         sys.exit(1)
@@ -171,29 +1265,105 @@ def main():
         print("Error: No repository provided. Set github_repo in config.json or use --repo", file=sys.stderr)
         sys.exit(1)
 
-    # Fetch mode: retrieve file and print to stdout
-    if args.fetch:
-        content = fetch_file(args.repo, args.fetch, args.token, args.branch)
-        if content is not None:
-            print(content, end="")
-            sys.exit(0)
-        else:
-            print(f"File not found: {args.fetch}", file=sys.stderr)
+    cache = None if args.no_cache else FileCache(max_bytes=args.cache_max_bytes)
+    queue = PushQueue()
+
+    # Push mode arguments are checked up front so --defer needs no network setup
+    files = []
+    if not (args.fetches or args.flush or args.sync_dir):
+        if not args.files:
+            print("Error: No files specified. Use --file to specify files to push", file=sys.stderr)
             sys.exit(1)
 
-    # Push mode: upload files
-    if not args.files:
-        print("Error: No files specified. Use --file to specify files to push", file=sys.stderr)
-        sys.exit(1)
+        if args.dests and len(args.files) != len(args.dests):
+            print("Error: Number of --file and --dest arguments must match", file=sys.stderr)
+            sys.exit(1)
 
-    if args.dests and len(args.files) != len(args.dests):
-        print("Error: Number of --file and --dest arguments must match", file=sys.stderr)
-        sys.exit(1)
+        dests = args.dests if args.dests else args.files
+        files = list(zip(args.files, dests))
+
+        for local_path, _ in files:
+            if not Path(local_path).exists():
+                print(f"Error: Local file not found: {local_path}", file=sys.stderr)
+                sys.exit(1)
+
+        if args.defer:
+            for local_path, dest_path in files:
+                queue.add(args.repo, args.branch, local_path, dest_path, args.message, append=args.append)
+            print(f"Queued {len(files)} file(s); push them with --flush")
+            sys.exit(0)
+
+    session = get_session(pool_size=max(args.pool_size, args.jobs), retries=args.retries)
+
+    # Fetch mode: retrieve file(s) and print to stdout
+    if args.fetches:
+        infos = map_concurrent(
+            lambda path: get_file_info(args.repo, path, args.token, args.branch, session, cache),
+            args.fetches,
+            args.jobs,
+        )
+        found = True
+        for path, info in zip(args.fetches, infos):
+            if info is None:
+                print(f"File not found: {path}", file=sys.stderr)
+                found = False
+                continue
+            # Label each file when several are printed, like `head`
+            if len(args.fetches) > 1:
+                print(f"==> {path} <==")
+            if info["content"] is not None:
+                print(info["content"], end="")
+                continue
+            # Large or binary file: stream the raw bytes straight to stdout
+            sys.stdout.flush()
+            if not download_file(args.repo, path, args.token, sys.stdout.buffer, args.branch, session):
+                found = False
+            sys.stdout.buffer.flush()
+        sys.exit(0 if found else 1)
+
+    # Flush mode: push writes queued by earlier failed or deferred pushes
+    if args.flush:
+        success = flush_queue(args.repo, args.token, queue, args.branch, session, cache)
+        sys.exit(0 if success else 1)
 
-    dests = args.dests if args.dests else args.files
-    files = list(zip(args.files, dests))
+    # Sync mode: push the difference between a local and a remote directory
+    if args.sync_dir:
+        if ":" not in args.sync_dir:
+            print("Error: --sync-dir must be LOCAL:REMOTE", file=sys.stderr)
+            sys.exit(1)
+        local_dir, remote_dir = args.sync_dir.rsplit(":", 1)
+        success = sync_dir(
+            args.repo, args.token, local_dir, remote_dir, args.message, args.branch,
+            session=session, cache=cache, delete=not args.no_delete, dry_run=args.dry_run,
+        )
+        sys.exit(0 if success else 1)
+
+    # Push mode: upload files
+    if args.append:
+        failed = [
+            (local_path, dest_path) for local_path, dest_path in files
+            if not append_file(
+                args.repo, args.token, local_path, dest_path, args.message, args.branch,
+                session, cache,
+            )
+        ]
+        # Queued as appends, so --flush adds the entry rather than replacing the note
+        for local_path, dest_path in failed:
+            queue.add(args.repo, args.branch, local_path, dest_path, args.message, append=True)
+        if failed:
+            print(f"Queued {len(failed)} append(s) for retry; run with --flush to push them", file=sys.stderr)
+        sys.exit(1 if failed else 0)
 
-    success = push_files(args.repo, args.token, files, args.message, args.branch)
+    success = push_files(
+        args.repo, args.token, files, args.message, args.branch,
+        batch=not args.no_batch, session=session, jobs=args.jobs, cache=cache,
+    )
+    if not success:
+        # Keep the data safe locally; files that did get through will be
+        # skipped as unchanged when the queue is flushed.
+        for local_path, dest_path in files:
+            queue.add(args.repo, args.branch, local_path, dest_path, args.message)
+        print(f"Queued {len(files)} file(s) for retry; run with --flush to push them", file=sys.stderr)
     sys.exit(0 if success else 1)
 
 
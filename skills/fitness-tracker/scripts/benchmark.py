@@ -0,0 +1,344 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["duckdb"]
+# ///
+# ABOUTME: Benchmarks parse_workout.py on synthetic workout notes.
+# ABOUTME: Usage: uv run benchmark.py [--lines 100000] [--files 5000] [--jobs N] [--seed 1] | --suite [--years 5]
+
+import argparse
+import contextlib
+import difflib
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+import generate_workouts
+import workout_data
+
+
+# Stages of --suite in the order a full parse run reaches them; each runs in
+# its own process so peak RSS is per stage
+SUITE_STAGES = [
+    "parse_workouts", "write_csv", "validate_exercises", "update_csv", "run_query", "run_reports",
+    "write_date_range",
+]
+SUITE_QUERY = "SELECT exercise, max(weight) AS best, count(*) AS sets FROM workouts GROUP BY exercise ORDER BY sets DESC"
+# Misspelled names in the generated notes give validation something to suggest
+SUITE_TYPO_RATE = 0.01
+# Most recent days re-parsed into the full history by the update_csv stage
+SUITE_UPDATE_DAYS = 7
+
+
+def iter_synthetic_days(seed=1):
+    """Yield (date, lines) for synthetic training days, each under its "## date" header."""
+    for day, text in generate_workouts.iter_notes(seed=seed, start=date(2000, 1, 1)):
+        yield day, [f"## {day.isoformat()}\n", "\n", *text.splitlines(True), "\n"]
+
+
+def synthetic_corpus(num_lines, seed=1):
+    """Build a list of workout markdown lines: date headers, exercises and set lines."""
+    lines = []
+    for _, day_lines in iter_synthetic_days(seed):
+        if len(lines) >= num_lines:
+            break
+        lines.extend(day_lines)
+    return lines[:num_lines]
+
+
+def write_daily_notes(directory, num_files, seed=1):
+    """Write num_files synthetic YYYY-MM-DD.md notes into directory."""
+    notes = generate_workouts.iter_notes(seed=seed, start=date(2000, 1, 1))
+    generate_workouts.write_notes(directory, itertools.islice(notes, num_files))
+
+
+def synthetic_rows(num_sets, seed=1):
+    """Yield parsed row dicts from synthetic days, num_sets in total."""
+    count = 0
+    for _, lines in iter_synthetic_days(seed):
+        for row in workout_data.iter_workout_lines(lines):
+            yield row
+            count += 1
+            if count == num_sets:
+                return
+
+
+def time_call(func, repeat):
+    """Best wall-clock time of `repeat` calls to func, and its last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_tokenizer(num_lines, seed, repeat):
+    """Time parsing a single large note against just reading its lines."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.md"
+        path.write_text("".join(synthetic_corpus(num_lines, seed)))
+
+        def read_only():
+            with open(path) as f:
+                return sum(1 for _ in f)
+
+        def parse():
+            return sum(1 for _ in workout_data.iter_workout_file(path))
+
+        read_time, _ = time_call(read_only, repeat)
+        parse_time, num_rows = time_call(parse, repeat)
+
+    print(f"Tokenizer: {num_lines:,} lines -> {num_rows:,} sets")
+    print(f"  read only   {read_time * 1000:9.1f} ms  {num_lines / read_time:12,.0f} lines/s")
+    print(f"  parse       {parse_time * 1000:9.1f} ms  {num_lines / parse_time:12,.0f} lines/s"
+          f"  {num_rows / parse_time:12,.0f} sets/s")
+    print(f"  parse/read  {parse_time / read_time:9.1f}x")
+
+
+def traced_bytes(build):
+    """Bytes still allocated by the result of build(), and the result's length."""
+    tracemalloc.start()
+    try:
+        result = build()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return allocated, len(result)
+
+
+def bench_memory(num_lines, seed):
+    """Compare memory per set of a list of row dicts and a WorkoutRows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "corpus.md"
+        path.write_text("".join(synthetic_corpus(num_lines, seed)))
+
+        dict_bytes, num_rows = traced_bytes(lambda: list(workout_data.iter_workout_file(path)))
+        columnar_bytes, _ = traced_bytes(lambda: workout_data.parse_workout_file(path))
+
+    print(f"Memory: {num_rows:,} sets held in memory")
+    print(f"  row dicts   {dict_bytes / num_rows:9.1f} B/set")
+    print(f"  columnar    {columnar_bytes / num_rows:9.1f} B/set")
+    print(f"  reduction   {dict_bytes / columnar_bytes:9.1f}x")
+
+
+def bench_files(num_files, seed, repeat, jobs):
+    """Time parsing a directory of daily notes serially and with --jobs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_daily_notes(tmp, num_files, seed)
+
+        def parse(n):
+            return lambda: sum(1 for _ in workout_data.iter_workouts(tmp, n))
+
+        serial_time, num_rows = time_call(parse(1), repeat)
+        parallel_time, _ = time_call(parse(jobs), repeat)
+
+    print(f"Files: {num_files:,} daily notes -> {num_rows:,} sets")
+    print(f"  serial      {serial_time * 1000:9.1f} ms  {num_files / serial_time:12,.0f} files/s")
+    print(f"  --jobs {jobs:<4} {parallel_time * 1000:9.1f} ms  {num_files / parallel_time:12,.0f} files/s")
+    print(f"  speedup     {serial_time / parallel_time:9.2f}x")
+
+
+def bench_matcher(num_names, seed, repeat, num_queries=100):
+    """Time exercise suggestions from the trigram index against difflib."""
+    rng = random.Random(seed)
+    base = workout_data.load_exercises() or ["Bench Press", "Squats", "Pull-ups"]
+    variants = ["Paused", "Tempo", "Deficit", "Banded", "Single Arm", "Wide Grip", "Incline", "Seated"]
+    names = [f"{rng.choice(base)} {rng.choice(variants)} {i}" for i in range(num_names)]
+    queries = [generate_workouts.misspell(rng, rng.choice(names)) for _ in range(num_queries)]
+    known_lower = {name.lower(): name for name in names}
+
+    def with_difflib():
+        return [difflib.get_close_matches(q, known_lower.keys(), n=1, cutoff=0.6) for q in queries]
+
+    build_time, index = time_call(lambda: workout_data.ExerciseIndex(names), repeat)
+    difflib_time, expected = time_call(with_difflib, 1)
+    index_time, found = time_call(lambda: [index.suggest(q) for q in queries], repeat)
+    agree = sum((known_lower[e[0]] if e else None) == f for e, f in zip(expected, found))
+
+    print(f"Matcher: {num_queries} misspelled names against {num_names:,} exercises")
+    print(f"  difflib     {difflib_time * 1000:9.1f} ms")
+    print(f"  index       {index_time * 1000:9.1f} ms  (+{build_time * 1000:.1f} ms to build)")
+    print(f"  speedup     {difflib_time / index_time:9.1f}x  same suggestion for {agree}/{num_queries}")
+
+
+def bench_reports(num_sets, seed, repeat):
+    """Time --report all (one shared scan) against running each report on its own."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "workouts.csv"
+        parquet_path = Path(tmp) / "workouts.parquet"
+        workout_data.write_csv(synthetic_rows(num_sets, seed), csv_path)
+        workout_data.write_parquet(synthetic_rows(num_sets, seed), parquet_path)
+
+        def reports(path, names):
+            with contextlib.redirect_stdout(io.StringIO()):
+                workout_data.run_reports(path, names)
+
+        def separately(path):
+            for name in workout_data.REPORTS:
+                reports(path, [name])
+
+        print(f"Reports: {len(workout_data.REPORTS)} reports over {num_sets:,} sets")
+        for label, path in [("csv", csv_path), ("parquet", parquet_path)]:
+            shared_time, _ = time_call(lambda: reports(path, list(workout_data.REPORTS)), repeat)
+            separate_time, _ = time_call(lambda: separately(path), repeat)
+            print(f"  {label:<8}  one scan {shared_time * 1000:8.1f} ms   "
+                  f"one scan per report {separate_time * 1000:8.1f} ms")
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it can't be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def csv_sets(csv_path):
+    with open(csv_path) as f:
+        return sum(1 for _ in f) - 1
+
+
+def run_stage(stage, notes, csv_path, repeat):
+    """Time one SUITE_STAGES stage in this process.
+
+    write_csv streams the notes into the CSV the way a full run does; later
+    stages read that CSV. Returns the best time, the items handled and this
+    process's peak RSS.
+    """
+    if stage == "parse_workouts":
+        seconds, rows = time_call(lambda: workout_data.parse_workouts(notes), repeat)
+        items, unit = len(rows), "sets"
+    elif stage == "write_csv":
+        seconds, items = time_call(
+            lambda: workout_data.write_csv(workout_data.iter_workouts(notes), csv_path), repeat)
+        unit = "sets"
+    elif stage == "validate_exercises":
+        names = {row["exercise"] for row in workout_data.iter_workouts(notes)}
+
+        def validate():
+            with contextlib.redirect_stderr(io.StringIO()):
+                workout_data.validate_exercises(names, workout_data.load_exercise_index())
+
+        seconds, _ = time_call(validate, repeat)
+        items, unit = len(names), "names"
+    elif stage == "update_csv":
+        recent = workout_data.workout_files(notes)[-SUITE_UPDATE_DAYS:]
+        new_rows = workout_data.WorkoutRows(itertools.chain.from_iterable(workout_data.iter_file_rows(recent)))
+        seconds, _ = time_call(lambda: workout_data.update_csv(csv_path, new_rows), repeat)
+        items, unit = csv_sets(csv_path), "sets"
+    elif stage == "write_date_range":
+        # What --since prints for the most recent week
+        since = workout_data.workout_files(notes)[-SUITE_UPDATE_DAYS].stem
+
+        def date_range():
+            out = io.BytesIO()
+            workout_data.write_date_range(csv_path, out, since)
+            return out.getvalue().count(b"\n") - 1
+
+        seconds, items = time_call(date_range, repeat)
+        unit = "sets"
+    else:
+        def query():
+            with contextlib.redirect_stdout(io.StringIO()):
+                if stage == "run_query":
+                    workout_data.run_query(csv_path, SUITE_QUERY)
+                else:
+                    workout_data.run_reports(csv_path, list(workout_data.REPORTS))
+
+        seconds, _ = time_call(query, repeat)
+        items, unit = csv_sets(csv_path), "sets"
+    return {"seconds": seconds, "items": items, "unit": unit, "rss": peak_rss_bytes()}
+
+
+def bench_suite(years, seed, repeat, notes=None):
+    """Run each SUITE_STAGES stage in a fresh process over years of generated notes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        if notes is None:
+            notes = Path(tmp) / "notes"
+            generated = generate_workouts.iter_notes(years, seed, typo_rate=SUITE_TYPO_RATE)
+            generate_workouts.write_notes(notes, generated)
+            label = f"{years} years of generated notes (seed {seed})"
+        else:
+            label = str(notes)
+        csv_path = Path(tmp) / "workouts.csv"
+
+        print(f"Suite: {len(workout_data.workout_files(notes)):,} daily notes, {label}")
+        print(f"  {'stage':<19} {'latency':>12}  {'throughput':>20}  {'peak RSS':>10}")
+        for stage in SUITE_STAGES:
+            command = [sys.executable, __file__, "--stage", stage, "--notes", str(notes),
+                       "--csv", str(csv_path), "--repeat", str(repeat)]
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode:
+                print(f"Error: stage {stage} failed\n{result.stderr}", file=sys.stderr)
+                sys.exit(1)
+            timing = json.loads(result.stdout)
+            rss = f"{timing['rss'] / 2**20:7.1f} MB" if timing["rss"] else "n/a"
+            print(f"  {stage:<19} {timing['seconds'] * 1000:9.1f} ms  "
+                  f"{timing['items'] / timing['seconds']:12,.0f} {timing['unit'] + '/s':<7}  {rss:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workout parsing on synthetic data")
+    parser.add_argument("--lines", type=int, default=100_000, help="Lines in the synthetic corpus (default: 100000)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the corpus (default: 1)")
+    parser.add_argument("--files", type=int, default=5000, help="Daily notes for the multi-file benchmark (default: 5000)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Processes for the parallel run (default: CPU count)")
+    parser.add_argument("--catalog", type=int, default=5000,
+                        help="Exercise names for the matcher benchmark (default: 5000)")
+    parser.add_argument("--sets", type=int, default=1_000_000,
+                        help="Sets for the analytics report benchmark (default: 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; best is reported (default: 3)")
+    parser.add_argument("--suite", action="store_true",
+                        help="Time each pipeline stage end to end, with peak RSS, instead")
+    parser.add_argument("--years", type=int, default=5, help="Years of notes to generate for --suite (default: 5)")
+    parser.add_argument("--notes", help="Run --suite on this directory of daily notes instead of generating them")
+    # Internal: run one --suite stage in this process
+    parser.add_argument("--stage", choices=SUITE_STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args.notes, args.csv, args.repeat)))
+        return
+
+    if args.suite:
+        if args.years <= 0 or args.repeat <= 0:
+            print("Error: --years and --repeat must be positive", file=sys.stderr)
+            sys.exit(1)
+        if args.notes and not Path(args.notes).is_dir():
+            print(f"Error: --notes must be a directory of daily notes: {args.notes}", file=sys.stderr)
+            sys.exit(1)
+        bench_suite(args.years, args.seed, args.repeat, args.notes)
+        return
+
+    if min(args.lines, args.files, args.jobs, args.catalog, args.sets) <= 0:
+        print("Error: --lines, --files, --jobs, --catalog and --sets must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    bench_tokenizer(args.lines, args.seed, args.repeat)
+    print()
+    bench_memory(args.lines, args.seed)
+    print()
+    bench_files(args.files, args.seed, args.repeat, args.jobs)
+    print()
+    bench_matcher(args.catalog, args.seed, args.repeat)
+    print()
+    bench_reports(args.sets, args.seed, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# /// script
+# requires-python = ">=3.9"
+# dependencies = []
+# ///
+# ABOUTME: Generates seeded, realistic daily workout notes (YYYY-MM-DD.md) for testing and benchmarks.
+# ABOUTME: Usage: uv run generate_workouts.py <output_dir> [--years 3] [--seed 1] [--start 2020-01-01]
+
+import argparse
+import itertools
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import workout_data
+
+
+# Catalog sections trained on each weekday, Monday first; Sunday is a rest day
+WEEKLY_SPLIT = [
+    ["Chest", "Arms - Triceps", "Cardio"],
+    ["Back", "Arms - Biceps"],
+    ["Legs", "Core"],
+    ["Cardio", "Other"],
+    ["Shoulders", "Arms - Triceps", "Core"],
+    ["Compound", "Legs", "Cardio"],
+    [],
+]
+
+# Exercises picked per section for a training block
+PROGRAM_SIZE = {"Chest": 3, "Back": 3, "Shoulders": 3, "Legs": 3, "Compound": 1, "Cardio": 1, "Other": 1}
+PROGRAM_WEEKS = 12
+
+# Typical first working weight for each lifting section
+START_WEIGHT = {
+    "Chest": 95, "Back": 75, "Shoulders": 45, "Legs": 135,
+    "Arms - Biceps": 25, "Arms - Triceps": 30, "Compound": 135,
+}
+
+# Logged as reps only, or (for sections) as a duration
+BODYWEIGHT = {
+    "Push-ups", "Diamond Push-ups", "Dips", "Tricep Dips", "Pull-ups", "Chin-ups",
+    "Back Extensions", "Burpees", "Lunges",
+}
+TIMED_SECTIONS = {"Cardio", "Other"}
+TIMED = {"Planks", "Side Planks"}
+LONG_CARDIO = {"Cycling", "Swimming", "Walking", "Running"}
+
+SET_NOTES = ["felt strong", "new PR", "form check", "grip gave out", "tempo reps"]
+CARDIO_NOTES = ["easy pace", "intervals", "outdoors", "zone 2"]
+
+
+def load_sections():
+    """Exercise names from reference/exercises.md grouped by their "## " section."""
+    sections = {}
+    current = None
+    with open(workout_data.EXERCISES_PATH) as f:
+        for line in f:
+            if line.startswith("## "):
+                current = sections.setdefault(line[3:].strip(), [])
+            elif current is not None:
+                current.extend(workout_data.parse_exercise_catalog([line])[0])
+    # "Rest Day" is a note, not something to train
+    return {section: [name for name in names if name != "Rest Day"] for section, names in sections.items()}
+
+
+def misspell(rng, name):
+    """Apply one to three random character edits to a lowercased name."""
+    chars = list(name.lower())
+    for _ in range(rng.randint(1, 3)):
+        i = rng.randrange(len(chars))
+        edit = rng.random()
+        if edit < 1 / 3 and len(chars) > 1:
+            del chars[i]
+        elif edit < 2 / 3:
+            chars.insert(i, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+        else:
+            chars[i] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+
+def format_weight(weight):
+    return f"{weight:g}"
+
+
+def format_minutes(minutes):
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes}m" if hours else f"{minutes}m"
+
+
+class WorkoutGenerator:
+    """Seeded lifter who follows a weekly split and slowly gets stronger.
+
+    Each PROGRAM_WEEKS block picks a few exercises per section; working
+    weights rise a plate at a time, ever more slowly, with the odd deload, so
+    per-exercise progressions look like real logs. Days are sometimes
+    skipped, and typo_rate of exercise names are misspelled the way hand
+    typed notes are.
+    """
+
+    def __init__(self, seed=1, start=date(2020, 1, 1), typo_rate=0.0, skip_rate=0.1, sections=None):
+        self.rng = random.Random(seed)
+        self.start = start
+        self.typo_rate = typo_rate
+        self.skip_rate = skip_rate
+        self.sections = sections or load_sections()
+        self.block = None
+        self.program = {}
+        # exercise -> (weight or reps, sessions since the last deload)
+        self.progress = {}
+
+    def _plan(self, day):
+        block = (day - self.start).days // (7 * PROGRAM_WEEKS)
+        if block != self.block:
+            self.block = block
+            self.program = {
+                section: self.rng.sample(names, min(len(names), PROGRAM_SIZE.get(section, 2)))
+                for section, names in self.sections.items() if names
+            }
+
+    def _name(self, exercise):
+        if self.rng.random() < self.typo_rate:
+            return misspell(self.rng, exercise)
+        return exercise
+
+    def _lift(self, section, exercise, first):
+        base = START_WEIGHT.get(section, 45)
+        weight, sessions = self.progress.get(exercise, (None, 0))
+        if weight is None:
+            weight = max(5, round(base * self.rng.uniform(0.6, 1.4) / 5) * 5)
+        elif sessions >= 24 and self.rng.random() < 0.2:
+            weight, sessions = max(5, round(weight * 0.9 / 5) * 5), 0
+        elif self.rng.random() < 0.3 * (base / weight) ** 2:
+            # Gains slow down as the weight climbs past where this section starts
+            weight += 5 if weight >= 100 else 2.5
+        self.progress[exercise] = (weight, sessions + 1)
+
+        lines = []
+        if first and weight >= 95 and self.rng.random() < 0.6:
+            warmup = max(45, round(weight * 0.6 / 5) * 5)
+            lines.append(f"- {format_weight(warmup)} - 10, 10 // warmup")
+        reps = self.rng.choice([5, 6, 8, 8, 10, 12])
+        sets = [reps - (i > 1 and self.rng.random() < 0.4) for i in range(self.rng.randint(3, 4))]
+        line = f"- {format_weight(weight)} - {', '.join(map(str, sets))}"
+        if self.rng.random() < 0.05:
+            line += f" // {self.rng.choice(SET_NOTES)}"
+        lines.append(line)
+        return lines
+
+    def _bodyweight(self, exercise):
+        reps, sessions = self.progress.get(exercise, (self.rng.randint(6, 15), 0))
+        if self.rng.random() < 0.2:
+            reps += 1
+        self.progress[exercise] = (reps, sessions + 1)
+        sets = [max(1, reps - i * self.rng.randint(0, 2)) for i in range(self.rng.randint(2, 4))]
+        return [f"- {', '.join(map(str, sets))}"]
+
+    def _timed(self, exercise):
+        if exercise in TIMED:
+            return [f"- {self.rng.randint(1, 3)}m"]
+        minutes = self.rng.randint(30, 90) if exercise in LONG_CARDIO else self.rng.randint(10, 40)
+        line = f"- {format_minutes(minutes)}"
+        if self.rng.random() < 0.1:
+            line += f" // {self.rng.choice(CARDIO_NOTES)}"
+        return [line]
+
+    def note(self, day):
+        """Markdown for one day's workout, or None for a rest or skipped day."""
+        self._plan(day)
+        split = WEEKLY_SPLIT[day.weekday()]
+        if not split:
+            # The odd Sunday walk or stretch
+            split = ["Other"] if self.rng.random() < 0.2 else []
+        if not split or self.rng.random() < self.skip_rate:
+            return None
+
+        blocks = []
+        for section in split:
+            for position, exercise in enumerate(self.program.get(section, [])):
+                if section in TIMED_SECTIONS or exercise in TIMED:
+                    sets = self._timed(exercise)
+                elif exercise in BODYWEIGHT or section == "Core":
+                    sets = self._bodyweight(exercise)
+                else:
+                    sets = self._lift(section, exercise, position == 0)
+                blocks.append("\n".join([self._name(exercise), *sets]))
+        return "\n\n".join(blocks) + "\n"
+
+
+def iter_notes(years=None, seed=1, start=date(2020, 1, 1), typo_rate=0.0):
+    """Yield (date, markdown) for each training day from start, for `years` or forever."""
+    generator = WorkoutGenerator(seed, start, typo_rate)
+    end = start + timedelta(days=round(365.25 * years)) if years else None
+    for offset in itertools.count():
+        day = start + timedelta(days=offset)
+        if end and day >= end:
+            return
+        text = generator.note(day)
+        if text:
+            yield day, text
+
+
+def write_notes(directory, notes):
+    """Write (date, markdown) notes as YYYY-MM-DD.md files; returns the file count."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    count = 0
+    for day, text in notes:
+        (directory / f"{day.isoformat()}.md").write_text(text)
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic daily workout notes")
+    parser.add_argument("output", help="Directory for the YYYY-MM-DD.md notes")
+    parser.add_argument("--years", type=int, default=3, help="Years of training to generate (default: 3)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--start", default="2020-01-01", help="First day, YYYY-MM-DD (default: 2020-01-01)")
+    parser.add_argument("--typo-rate", type=float, default=0.0,
+                        help="Fraction of exercise names to misspell (default: 0)")
+    args = parser.parse_args()
+
+    try:
+        start = date.fromisoformat(args.start)
+    except ValueError:
+        print(f"Error: --start must be a YYYY-MM-DD date, got {args.start!r}", file=sys.stderr)
+        sys.exit(1)
+    if args.years <= 0 or not 0 <= args.typo_rate <= 1:
+        print("Error: --years must be positive and --typo-rate between 0 and 1", file=sys.stderr)
+        sys.exit(1)
+
+    count = write_notes(args.output, iter_notes(args.years, args.seed, start, args.typo_rate))
+    print(f"Wrote {count} daily notes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,58 +5,35 @@
 # ABOUTME: Parses workout markdown files into CSV and supports DuckDB queries.
 # ABOUTME: Usage: uv run parse_workout.py <input> [-o output.csv] [--query "SQL"]
 
+from __future__ import annotations
+
 import argparse
-import csv
-import difflib
+import itertools
 import json
-import re
 import sys
+import time
 from pathlib import Path
 
-
-def load_exercises():
-    """Load known exercises from reference/exercises.md."""
-    script_dir = Path(__file__).parent
-    exercises_path = script_dir.parent / "reference" / "exercises.md"
-
-    exercises = []
-    if exercises_path.exists():
-        with open(exercises_path) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("- "):
-                    exercises.append(line[2:].strip())
-    return exercises
-
-
-def validate_exercises(rows, known_exercises):
-    """Check for unrecognized exercises and suggest matches."""
-    if not known_exercises:
-        return
-
-    unique_exercises = set(row["exercise"] for row in rows)
-    known_lower = {e.lower(): e for e in known_exercises}
-    unrecognized = []
-
-    for exercise in unique_exercises:
-        if exercise.lower() not in known_lower:
-            matches = difflib.get_close_matches(
-                exercise.lower(),
-                known_lower.keys(),
-                n=1,
-                cutoff=0.6
-            )
-            if matches:
-                suggestion = known_lower[matches[0]]
-                unrecognized.append(f"  '{exercise}' - did you mean '{suggestion}'?")
-            else:
-                unrecognized.append(f"  '{exercise}' - no close match found")
-
-    if unrecognized:
-        print("\nUnrecognized exercises:", file=sys.stderr)
-        for msg in sorted(unrecognized):
-            print(msg, file=sys.stderr)
-        print(file=sys.stderr)
+from warm import add_warm_arguments, begin_main, lazy_import, run_main, warm_socket
+from workout_data import (
+    REPORTS,
+    is_date,
+    is_parquet,
+    iter_workout_lines,
+    iter_workouts,
+    load_exercise_index,
+    print_date_range,
+    run_query,
+    run_reports,
+    track_rows,
+    update_db,
+    validate_exercises,
+    write_incremental,
+    write_output,
+)
+
+# A --serve daemon listens here for --warm invocations
+WARM_SOCKET = warm_socket(__file__)
 
 
 def load_config():
@@ -70,187 +47,15 @@ def load_config():
     return {}
 
 
-def parse_duration(text):
-    """Parse duration strings like '30m', '1h', '1h30m' into minutes."""
-    text = text.strip().lower()
-    total_minutes = 0
-
-    hours_match = re.search(r'(\d+)h', text)
-    mins_match = re.search(r'(\d+)m', text)
-
-    if hours_match:
-        total_minutes += int(hours_match.group(1)) * 60
-    if mins_match:
-        total_minutes += int(mins_match.group(1))
-
-    return total_minutes if total_minutes > 0 else None
-
-
-def parse_set_line(line, current_date, current_exercise, set_counter):
-    """Parse a set line and return list of row dicts (one per set)."""
-    rows = []
-
-    # Extract comment if present
-    notes = ""
-    if "//" in line:
-        line, notes = line.split("//", 1)
-        notes = notes.strip()
-
-    line = line.strip().lstrip("-").strip()
-
-    # Check if it's a duration (e.g., "30m", "1h30m")
-    if re.match(r'^[\d]+[hm]', line) or re.match(r'^\d+h\d+m$', line):
-        duration = parse_duration(line)
-        rows.append({
-            "date": current_date,
-            "exercise": current_exercise,
-            "set_num": set_counter,
-            "weight": "",
-            "reps": "",
-            "duration_min": duration,
-            "notes": notes
-        })
-        return rows, set_counter + 1
-
-    # Check for weight - reps pattern (e.g., "135 - 10, 10")
-    weight_match = re.match(r'^(\d+(?:\.\d+)?)\s*-\s*(.+)$', line)
-    if weight_match:
-        weight = weight_match.group(1)
-        reps_part = weight_match.group(2)
-    else:
-        weight = ""
-        reps_part = line
-
-    # Parse comma-separated reps
-    reps_list = [r.strip() for r in reps_part.split(",") if r.strip()]
-
-    for reps in reps_list:
-        # Handle rep counts (could be just numbers)
-        if reps.isdigit():
-            rows.append({
-                "date": current_date,
-                "exercise": current_exercise,
-                "set_num": set_counter,
-                "weight": weight,
-                "reps": int(reps),
-                "duration_min": "",
-                "notes": notes if set_counter == 1 or len(reps_list) == 1 else ""
-            })
-            set_counter += 1
-
-    return rows, set_counter
-
-
-def extract_date_from_filename(filepath):
-    """Extract date from filename like 2026-01-02.md."""
-    name = Path(filepath).stem
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', name):
-        return name
-    return None
-
-
-def parse_workout_file(filepath):
-    """Parse a workout markdown file and return list of row dicts."""
-    rows = []
-    current_date = extract_date_from_filename(filepath)
-    current_exercise = None
-    set_counter = 1
-
-    with open(filepath, "r") as f:
-        for line in f:
-            line = line.rstrip()
-
-            # Skip empty lines
-            if not line.strip():
-                continue
-
-            # Date header: ## YYYY-MM-DD
-            date_match = re.match(r'^##\s+(\d{4}-\d{2}-\d{2})', line)
-            if date_match:
-                current_date = date_match.group(1)
-                current_exercise = None
-                continue
-
-            # Skip other headers
-            if line.startswith("#"):
-                continue
-
-            # Set line (starts with -)
-            if line.strip().startswith("-"):
-                if current_date and current_exercise:
-                    new_rows, set_counter = parse_set_line(
-                        line, current_date, current_exercise, set_counter
-                    )
-                    rows.extend(new_rows)
-                continue
-
-            # Exercise name (non-empty line that doesn't start with - or #)
-            if line.strip() and not line.strip().startswith("-"):
-                current_exercise = line.strip()
-                set_counter = 1
-
-    return rows
-
-
-def parse_workouts(input_path):
-    """Parse workout file(s) from path (file or directory)."""
-    input_path = Path(input_path)
-    all_rows = []
-
-    if input_path.is_file():
-        all_rows.extend(parse_workout_file(input_path))
-    elif input_path.is_dir():
-        for md_file in sorted(input_path.glob("????-??-??.md")):
-            all_rows.extend(parse_workout_file(md_file))
-    else:
-        raise FileNotFoundError(f"Path not found: {input_path}")
-
-    return all_rows
-
-
-def write_csv(rows, output_path):
-    """Write rows to CSV file."""
-    fieldnames = ["date", "exercise", "set_num", "weight", "reps", "duration_min", "notes"]
-
-    with open(output_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-
-
-def update_csv(csv_path, new_rows):
-    """Update CSV by replacing rows for dates in new_rows, keeping other dates."""
-    fieldnames = ["date", "exercise", "set_num", "weight", "reps", "duration_min", "notes"]
-    dates_to_replace = set(row["date"] for row in new_rows)
+def preload_warm():
+    """Imports a --serve daemon keeps loaded for --warm invocations."""
+    lazy_import("duckdb")
+    lazy_import("difflib")
 
-    existing = []
-    csv_path = Path(csv_path)
-    if csv_path.exists():
-        with open(csv_path) as f:
-            reader = csv.DictReader(f)
-            existing = [row for row in reader if row["date"] not in dates_to_replace]
 
-    all_rows = existing + new_rows
-    all_rows.sort(key=lambda r: (r["date"], r["exercise"], int(r["set_num"])))
-    write_csv(all_rows, csv_path)
+def main(argv: list[str] | None = None, startup_ms: float | None = None):
+    argv, startup_ms = begin_main(argv, startup_ms, WARM_SOCKET)
 
-
-def run_query(csv_path, query):
-    """Run a DuckDB query against the CSV file."""
-    try:
-        import duckdb
-    except ImportError:
-        print("Error: duckdb not installed. Run script with: uv run parse_workout.py", file=sys.stderr)
-        sys.exit(1)
-
-    # Replace 'workouts' table reference with the CSV file path
-    query = query.replace("workouts", f"'{csv_path}'")
-
-    result = duckdb.query(query)
-    print(result)
-
-
-def main():
     config = load_config()
 
     parser = argparse.ArgumentParser(
@@ -260,51 +65,179 @@ def main():
         "input",
         nargs="?",
         default=config.get("obsidian_workout_dir", ""),
-        help="Workout markdown file or directory (default: from config.json)"
+        help="Workout markdown file or directory, or - to read a note from stdin (default: from config.json)"
+    )
+    parser.add_argument(
+        "--date",
+        help="Date of a note read from stdin, until a '## YYYY-MM-DD' header (default: today)"
     )
     parser.add_argument(
         "-o", "--output",
-        default="workouts.csv",
-        help="Output CSV file (default: workouts.csv)"
+        help="Output file (default: workouts.csv, or workouts.parquet with --format parquet)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        help="Output format; parquet has typed columns sorted by date "
+             "(default: that of an existing output, else csv)"
     )
     parser.add_argument(
         "--append", "-a",
         action="store_true",
         help="Update existing CSV: replace rows for parsed dates, keep others"
     )
+    parser.add_argument(
+        "--partition",
+        action="store_true",
+        help="Write monthly YYYY-MM.csv partitions into the --output directory; "
+             "--append then rewrites only the affected months (implied when --output is a directory)"
+    )
+    parser.add_argument(
+        "--incremental", "-i",
+        action="store_true",
+        help="Only re-parse files changed since the last --incremental run (tracked in .<output>.manifest.json)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=config.get("parse_jobs", 1),
+        help="Parse files on up to N processes; output order is unchanged (default: from config.json or 1)"
+    )
+    parser.add_argument(
+        "--db",
+        help="Also load the output into this DuckDB file with precomputed personal_records, "
+             "weekly_volume and estimated_1rm tables; --query then runs against it"
+    )
     parser.add_argument("--query", "-q", help="Run DuckDB query after parsing")
+    parser.add_argument(
+        "--report",
+        choices=["all", *REPORTS],
+        help="Print analytics after parsing: PR timeline (prs), weekly volume, best e1RM, "
+             "progression slopes, or all of them from one scan"
+    )
+    parser.add_argument(
+        "--since",
+        help="Only use rows from this YYYY-MM-DD on: printed as CSV, the rows --query sees, "
+             "or the --report rows shown (reports still account for earlier history)"
+    )
+    parser.add_argument("--until", help="Only use rows up to this YYYY-MM-DD, inclusive (see --since)")
+    parser.add_argument(
+        "--no-parse",
+        action="store_true",
+        help="Skip parsing and only run --query, --report or --since/--until against the existing output or --db"
+    )
+    add_warm_arguments(parser)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    run_main(run, args, main, startup_ms, WARM_SOCKET, preload_warm)
+
+
+def run(args):
+    """Parse, write and query as selected on the command line."""
+    args.output = args.output or f"workouts.{args.format or 'csv'}"
+
+    for flag, value in [("--date", args.date), ("--since", args.since), ("--until", args.until)]:
+        if value and not is_date(value):
+            print(f"Error: {flag} must be a YYYY-MM-DD date, got {value!r}", file=sys.stderr)
+            sys.exit(1)
+    if args.since and args.until and args.since > args.until:
+        print("Error: --since must not be after --until", file=sys.stderr)
+        sys.exit(1)
+
+    if args.no_parse:
+        if not args.query and not args.report and not (args.since or args.until):
+            print("Error: --no-parse needs a --query, --report or --since/--until to run", file=sys.stderr)
+            sys.exit(1)
+        report_and_query(args)
+        return
 
     if not args.input:
         print("Error: No input path provided. Set obsidian_workout_dir in config.json or pass as argument.", file=sys.stderr)
         sys.exit(1)
 
-    # Load known exercises for validation
-    known_exercises = load_exercises()
-
-    # Parse workouts
-    rows = parse_workouts(args.input)
+    if args.incremental and args.append:
+        print("Error: --incremental cannot be combined with --append", file=sys.stderr)
+        sys.exit(1)
 
-    if not rows:
-        print("No workout data found.", file=sys.stderr)
+    from_stdin = args.input == "-"
+    if from_stdin and args.incremental:
+        print("Error: --incremental needs workout files, not stdin", file=sys.stderr)
         sys.exit(1)
 
-    # Validate exercise names
-    validate_exercises(rows, known_exercises)
+    # An existing output directory holds monthly partitions
+    partitioned = args.partition or Path(args.output).is_dir()
+    if partitioned and args.incremental:
+        print("Error: --incremental writes a single CSV and cannot be used with partitions", file=sys.stderr)
+        sys.exit(1)
+    # An existing Parquet output keeps its format, so --append doesn't read it as CSV
+    output_is_parquet = is_parquet(args.output)
+    if args.format is None:
+        args.format = "parquet" if output_is_parquet else "csv"
+    elif args.append and Path(args.output).is_file() and output_is_parquet != (args.format == "parquet"):
+        print(f"Error: {args.output} is not {args.format}; drop --format or pass a different -o",
+              file=sys.stderr)
+        sys.exit(1)
+    if args.format == "parquet" and (partitioned or args.incremental):
+        print("Error: --format parquet writes a single file and cannot be combined with "
+              "--partition or --incremental", file=sys.stderr)
+        sys.exit(1)
 
-    # Write CSV
-    if args.append:
-        update_csv(args.output, rows)
-        print(f"Updated {args.output} with {len(rows)} sets")
+    # Load known exercises for canonical names and validation
+    exercise_index = load_exercise_index()
+    exercises = set()
+    dates = set()
+
+    if args.incremental:
+        count, parsed, total = write_incremental(args.input, args.output, exercises, args.jobs, exercise_index)
+        if not count:
+            print("No workout data found.", file=sys.stderr)
+            sys.exit(1)
+        print(f"Wrote {count} sets to {args.output} (parsed {parsed} of {total} files)")
     else:
-        write_csv(rows, args.output)
-        print(f"Wrote {len(rows)} sets to {args.output}")
+        # Parse workouts lazily; rows stream straight into the writer
+        if from_stdin:
+            rows = iter_workout_lines(sys.stdin, args.date or time.strftime("%Y-%m-%d"))
+        else:
+            rows = iter_workouts(args.input, args.jobs)
+        first = next(rows, None)
+
+        if first is None:
+            print("No workout data found.", file=sys.stderr)
+            sys.exit(1)
 
-    # Run query if provided
+        rows = track_rows(itertools.chain([first], rows), exercises, dates, exercise_index)
+
+        count = write_output(rows, args.output, args.format, args.append, partitioned)
+        if args.append:
+            print(f"Updated {args.output} with {count} sets")
+        else:
+            print(f"Wrote {count} sets to {args.output}")
+
+    # Upsert the parsed dates into the database, or reload it after a full write
+    if args.db:
+        update_db(args.db, args.output, dates if args.append else None)
+        print(f"Loaded into {args.db}")
+
+    # Validate exercise names seen while writing
+    validate_exercises(exercises, exercise_index)
+
+    report_and_query(args)
+
+
+def report_and_query(args):
+    """Print any requested --report and --query results, or else the --since/--until rows."""
+    if args.report:
+        print()
+        run_reports(args.output, list(REPORTS) if args.report == "all" else [args.report],
+                    args.db, args.since, args.until)
     if args.query:
         print()
-        run_query(args.output, args.query)
+        run_query(args.output, args.query, args.db, args.since, args.until)
+    if (args.since or args.until) and not (args.report or args.query):
+        # Keep the CSV clean for redirecting when nothing else was printed
+        if not args.no_parse:
+            print()
+        print_date_range(args.output, args.since, args.until, args.db)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,266 @@
+# ABOUTME: Startup profiling and the --serve/--warm daemon shared by the skill scripts.
+# ABOUTME: Each skill's scripts/ directory has a copy; keep them identical, like github_sync.py.
+
+from __future__ import annotations
+
+import base64
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+# Interpreter start plus module-level imports should stay under this; heavy
+# dependencies are imported lazily by the commands that need them
+STARTUP_BUDGET_MS = 150
+# Deferred imports and how long each took, for --profile-startup
+IMPORT_TIMES = {}
+
+WARM_IDLE_TIMEOUT = 15 * 60
+
+
+def warm_socket(script) -> Path:
+    """Socket a --serve daemon for script listens on, next to the script."""
+    script = Path(script)
+    return script.parent / f".{script.stem}.warm.sock"
+
+
+def lazy_import(name: str):
+    """Import a module on first use, recording how long the import took."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+def print_startup_profile(startup_ms: float, run_seconds: float) -> None:
+    """Print startup and deferred import costs to stderr for --profile-startup."""
+    print("\nStartup profile:", file=sys.stderr)
+    print(f"  {startup_ms:8.1f} ms  interpreter + module imports (CPU)", file=sys.stderr)
+    for name, seconds in IMPORT_TIMES.items():
+        print(f"  {seconds * 1000:8.1f} ms  import {name} (deferred)", file=sys.stderr)
+    print(f"  {run_seconds * 1000:8.1f} ms  run, including deferred imports", file=sys.stderr)
+    if startup_ms > STARTUP_BUDGET_MS:
+        print(
+            f"  Over the {STARTUP_BUDGET_MS} ms startup budget by {startup_ms - STARTUP_BUDGET_MS:.1f} ms",
+            file=sys.stderr,
+        )
+    if IMPORT_TIMES:
+        print("  (run a --serve daemon and pass --warm to skip deferred imports)", file=sys.stderr)
+
+
+def begin_main(argv: list[str] | None, startup_ms: float | None, socket_path: Path) -> tuple[list[str], float]:
+    """Start a script's main(argv, startup_ms), handing --warm runs to a daemon.
+
+    Returns the arguments and startup time to run with here; exits with the
+    daemon's code if one handled the invocation.
+    """
+    # CPU time so far is what the interpreter and module imports cost
+    if startup_ms is None:
+        startup_ms = time.process_time() * 1000
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Hand off to a warm daemon before doing any real work
+    if "--warm" in argv:
+        code = run_warm([arg for arg in argv if arg != "--warm"], socket_path, startup_ms)
+        if code is not None:
+            sys.exit(code)
+    return argv, startup_ms
+
+
+def add_warm_arguments(parser) -> None:
+    """Add --profile-startup, --serve and --warm to a script's argument parser."""
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help=f"Print startup and deferred import costs to stderr (budget: {STARTUP_BUDGET_MS} ms; "
+             "use python -X importtime for a per-module breakdown)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a warm daemon that handles --warm invocations without paying startup costs"
+    )
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Hand this invocation to a running --serve daemon (runs normally if none is running)"
+    )
+
+
+def run_main(run, args, main, startup_ms: float, socket_path: Path, preload=None) -> None:
+    """Serve --warm invocations of main for --serve; otherwise run(args).
+
+    With --profile-startup, the startup and deferred import costs are
+    printed once run returns or fails.
+    """
+    if args.serve:
+        serve_warm(main, socket_path, preload)
+        sys.exit(0)
+
+    IMPORT_TIMES.clear()
+    started = time.perf_counter()
+    try:
+        run(args)
+    finally:
+        if args.profile_startup:
+            print_startup_profile(startup_ms, time.perf_counter() - started)
+
+
+class WarmStream(io.TextIOBase):
+    """Text stream that forwards writes to a --warm client over the daemon socket."""
+
+    def __init__(self, send, name: str):
+        self.send = send
+        self.name = name
+        self.buffer = WarmBuffer(send, name)
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send({"stream": self.name, "text": text})
+        return len(text)
+
+
+class WarmBuffer(io.RawIOBase):
+    """Binary counterpart of WarmStream, for output written to sys.stdout.buffer."""
+
+    def __init__(self, send, name: str):
+        self.send = send
+        self.name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self.send({"stream": self.name, "b64": base64.b64encode(data).decode("ascii")})
+        return len(data)
+
+
+def serve_warm(main, socket_path: Path, preload=None, idle_timeout: float = WARM_IDLE_TIMEOUT) -> None:
+    """Run as a daemon that executes --warm invocations of main in this process.
+
+    preload runs once up front to import or open whatever the script needs,
+    which then stays warm between invocations, so each one only pays for a
+    small client process. Requests are handled one at a time; the daemon
+    exits after idle_timeout seconds without requests.
+    """
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: Warm mode needs Unix domain sockets", file=sys.stderr)
+        sys.exit(1)
+
+    if preload:
+        preload()
+    socket_path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o077)
+    try:
+        server.bind(str(socket_path))
+    finally:
+        os.umask(umask)
+    server.listen()
+    server.settimeout(idle_timeout)
+    print(f"Warm daemon listening on {socket_path}", file=sys.stderr)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            with conn:
+                conn.settimeout(None)
+                try:
+                    handle_warm_request(conn, main)
+                except (OSError, ValueError) as e:
+                    print(f"Warm request failed: {e}", file=sys.stderr)
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+
+
+def handle_warm_request(conn, main) -> None:
+    """Run one forwarded invocation, streaming its output back to the client."""
+    stream = conn.makefile("rwb")
+    request = json.loads(stream.readline())
+    client_gone = False
+
+    def send(message: dict) -> None:
+        # If the client hangs up (e.g. piped into `head`), finish quietly
+        nonlocal client_gone
+        if client_gone:
+            return
+        try:
+            stream.write(json.dumps(message).encode("utf-8") + b"\n")
+            stream.flush()
+        except OSError:
+            client_gone = True
+
+    code = 0
+    cwd = os.getcwd()
+    # The client forwards its stdin when an argument is "-"
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(request.get("stdin", ""))
+    try:
+        os.chdir(request["cwd"])
+        with contextlib.redirect_stdout(WarmStream(send, "stdout")), \
+                contextlib.redirect_stderr(WarmStream(send, "stderr")):
+            try:
+                main(request["argv"], request.get("startup_ms", 0.0))
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else int(e.code is not None)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+    except OSError as e:
+        send({"stream": "stderr", "text": f"Error: {e}\n"})
+        code = 1
+    finally:
+        os.chdir(cwd)
+        sys.stdin = stdin
+    send({"exit": code})
+
+
+def run_warm(argv: list[str], socket_path: Path, startup_ms: float = 0.0) -> int | None:
+    """Forward an invocation to a running --serve daemon.
+
+    Returns the daemon's exit code, or None if no daemon is reachable.
+    """
+    import socket
+
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(socket_path))
+    except OSError:
+        conn.close()
+        return None
+
+    with conn, conn.makefile("rwb") as stream:
+        request = {"argv": argv, "cwd": os.getcwd(), "startup_ms": startup_ms}
+        if "-" in argv:
+            request["stdin"] = sys.stdin.read()
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if "exit" in message:
+                return message["exit"]
+            out = sys.stdout if message["stream"] == "stdout" else sys.stderr
+            if "b64" in message:
+                out.flush()
+                out.buffer.write(base64.b64decode(message["b64"]))
+                out.buffer.flush()
+            else:
+                out.write(message["text"])
+    print("Error: Warm daemon exited mid-request", file=sys.stderr)
+    return 1
@@ -0,0 +1,1406 @@
+# ABOUTME: Workout note parsing, CSV/Parquet output and DuckDB queries behind parse_workout.py.
+# ABOUTME: A module rather than part of the script so Python caches its compiled bytecode.
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+from warm import lazy_import
+
+EXERCISES_PATH = Path(__file__).parent.parent / "reference" / "exercises.md"
+# Catalog entries may list aliases: "- Overhead Press (also: OHP)"
+ALIAS_RE = re.compile(r"(?P<name>.+?)\s*\(also:\s*(?P<aliases>[^)]*)\)")
+# Fuzzy exercise index, rebuilt whenever exercises.md changes; kept out of
+# github_sync.py's .cache/, whose eviction would treat it as a fetch entry
+EXERCISE_INDEX_CACHE = Path(__file__).parent / ".exercise_index.json"
+EXERCISE_INDEX_VERSION = 1
+
+# Sidecar next to the output CSV recording what each source file produced;
+# bump the version whenever parsing changes what a file produces
+MANIFEST_VERSION = 3
+
+# Sidecar next to an output CSV mapping each date to its rows' byte range,
+# for --since/--until
+DATE_INDEX_VERSION = 1
+
+# Most files a --jobs worker parses per task
+PARSE_CHUNK_SIZE = 64
+
+# Partitioned output: one CSV per month, named YYYY-MM.csv
+PARTITION_GLOB = "????-??.csv"
+
+# DuckDB types of the output columns, for Parquet output
+COLUMN_TYPES = {
+    "date": "DATE",
+    "exercise": "VARCHAR",
+    "set_num": "INTEGER",
+    "weight": "DOUBLE",
+    "reps": "INTEGER",
+    "duration_min": "INTEGER",
+    "notes": "VARCHAR",
+}
+# One-rep max estimates from a set's weight and reps (reps > 0)
+EPLEY_SQL = "CASE WHEN reps = 1 THEN weight ELSE weight * (1 + reps / 30.0) END"
+BRZYCKI_SQL = "CASE WHEN reps < 37 THEN weight * 36.0 / (37 - reps) END"
+
+# Summary tables rebuilt in a --db database after every load
+SUMMARY_TABLES = {
+    # Heaviest set per exercise, earliest date it was reached
+    "personal_records": """
+        SELECT exercise, weight, reps, date
+        FROM workouts
+        WHERE weight IS NOT NULL
+        QUALIFY row_number() OVER (PARTITION BY exercise ORDER BY weight DESC, reps DESC NULLS LAST, date) = 1
+    """,
+    "weekly_volume": """
+        SELECT date_trunc('week', date)::DATE AS week, exercise,
+               count(*) AS sets, sum(reps) AS reps, sum(weight * reps) AS volume
+        FROM workouts
+        GROUP BY ALL
+    """,
+    # Best Epley estimate (weight * (1 + reps / 30)) per exercise and day
+    "estimated_1rm": f"""
+        SELECT date, exercise, max({EPLEY_SQL}) AS e1rm
+        FROM workouts
+        WHERE weight IS NOT NULL AND reps > 0
+        GROUP BY ALL
+    """,
+}
+
+# --report scans workouts once into this per-day, per-exercise table; every
+# report is computed from it
+DAILY_SQL = f"""
+    SELECT date, exercise,
+           max(weight) AS top_weight,
+           max_by(reps, (weight, reps)) AS top_reps,
+           max({EPLEY_SQL}) FILTER (WHERE reps > 0) AS epley,
+           max({BRZYCKI_SQL}) FILTER (WHERE reps > 0) AS brzycki,
+           sum(weight * reps) AS volume,
+           count(*) AS sets
+    FROM workouts
+    GROUP BY ALL
+"""
+# Reports are computed over the whole history, so PRs and trends account for
+# earlier sessions; {since} and {until} (DATE literals, unbounded by default)
+# then pick the rows whose dates fall in a --since/--until window
+REPORTS = {
+    # Each day an exercise's top weight beat every earlier session
+    "prs": ("PR timeline", """
+        SELECT date, exercise, top_weight AS weight, top_reps AS reps
+        FROM (
+            SELECT *, max(top_weight) OVER (
+                PARTITION BY exercise ORDER BY date
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ) AS previous_best
+            FROM daily
+            WHERE top_weight IS NOT NULL
+        )
+        WHERE (previous_best IS NULL OR top_weight > previous_best)
+          AND date BETWEEN {since} AND {until}
+        ORDER BY exercise, date
+    """),
+    "volume": ("Weekly volume (weight x reps)", """
+        SELECT week, volume, sets,
+               sum(volume) OVER (ORDER BY week RANGE BETWEEN INTERVAL 21 DAYS PRECEDING AND CURRENT ROW) / 4
+                   AS rolling_4wk_avg
+        FROM (
+            SELECT date_trunc('week', date)::DATE AS week, sum(volume) AS volume, sum(sets) AS sets
+            FROM daily
+            GROUP BY ALL
+        )
+        QUALIFY week <= {until} AND week + 6 >= {since}
+        ORDER BY week
+    """),
+    "e1rm": ("Best estimated 1RM", """
+        SELECT exercise, round(max(epley), 1) AS epley, round(max(brzycki), 1) AS brzycki,
+               max_by(date, epley) AS date
+        FROM daily
+        WHERE epley IS NOT NULL
+        GROUP BY exercise
+        HAVING max_by(date, epley) BETWEEN {since} AND {until}
+        ORDER BY max(epley) DESC, exercise
+    """),
+    # Least-squares trend of each session's best Epley e1RM
+    "progression": ("Progression (e1RM change per week)", """
+        SELECT exercise, count(*) AS sessions, min(date) AS first, max(date) AS last,
+               round(regr_slope(epley, date - DATE '1970-01-01') * 7, 2) AS e1rm_per_week
+        FROM daily
+        WHERE epley IS NOT NULL
+        GROUP BY exercise
+        HAVING count(*) >= 3 AND max(date) >= {since} AND min(date) <= {until}
+        ORDER BY e1rm_per_week DESC, exercise
+    """),
+}
+
+# Parquet rows are sorted so row-group date statistics allow pruning; the
+# trailing columns only break ties, so rewrites of the same data are identical
+PARQUET_ORDER = "date, exercise, set_num, weight, reps, duration_min, notes"
+
+FIELDNAMES = ["date", "exercise", "set_num", "weight", "reps", "duration_min", "notes"]
+
+
+def parse_exercise_catalog(lines):
+    """Parse exercises.md lines into (names, aliases).
+
+    Entries are "- Name" or "- Name (also: Alias, Other Alias)"; aliases map
+    each lowercased alias to its exercise name.
+    """
+    names = []
+    aliases = {}
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("- "):
+            continue
+        entry = line[2:].strip()
+        match = ALIAS_RE.fullmatch(entry)
+        if match:
+            entry = match.group("name")
+            for alias in match.group("aliases").split(","):
+                if alias.strip():
+                    aliases[alias.strip().lower()] = entry
+        names.append(entry)
+    return names, aliases
+
+
+def load_exercises():
+    """Load known exercises from reference/exercises.md."""
+    if not EXERCISES_PATH.exists():
+        return []
+    with open(EXERCISES_PATH) as f:
+        return parse_exercise_catalog(f)[0]
+
+
+def trigrams(text):
+    """Character trigrams of a lowercased name, padded to weight its start and end."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseIndex:
+    """Trigram index over known exercise names and their aliases.
+
+    Suggestions score only the few names that share the most trigrams with
+    the unknown one, using difflib's similarity ratio, instead of comparing
+    it against the whole catalog.
+    """
+
+    # Names shortlisted by shared trigrams before scoring with difflib
+    CANDIDATES = 10
+
+    def __init__(self, names, aliases=None):
+        # Keys are lowercased names and aliases; targets are what they mean
+        self.targets = {name.lower(): name for name in names}
+        self.targets.update(aliases or {})
+        self.keys = list(self.targets)
+        self.postings = {}
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self.postings.setdefault(gram, []).append(key_id)
+
+    def to_dict(self) -> dict:
+        return {"targets": self.targets, "postings": self.postings}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExerciseIndex":
+        index = cls.__new__(cls)
+        index.targets = data["targets"]
+        index.keys = list(index.targets)
+        index.postings = data["postings"]
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, name):
+        """Exercise a name or alias refers to (case-insensitive), or None."""
+        return self.targets.get(name.lower())
+
+    def suggest(self, name, cutoff=0.6):
+        """Closest known exercise to an unrecognized name, or None."""
+        difflib = lazy_import("difflib")
+        word = name.lower()
+        grams = trigrams(word)
+
+        shared = {}
+        for gram in grams:
+            for key_id in self.postings.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+        # Shortlist by Dice coefficient; a key of n chars has n + 1 padded trigrams
+        shortlist = heapq.nlargest(
+            self.CANDIDATES, shared,
+            key=lambda key_id: 2 * shared[key_id] / (len(grams) + len(self.keys[key_id]) + 1),
+        )
+
+        # Score like difflib.get_close_matches: best ratio, ties to the larger key
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        scored = []
+        for key_id in shortlist:
+            matcher.set_seq1(self.keys[key_id])
+            scored.append((matcher.ratio(), self.keys[key_id]))
+        score, best = max(scored, default=(0.0, None))
+        return self.targets[best] if score >= cutoff else None
+
+
+def load_exercise_index():
+    """Build the ExerciseIndex for reference/exercises.md, cached on disk.
+
+    The cache is keyed by the catalog's hash, so editing exercises.md
+    rebuilds it. Returns None if there is no catalog.
+    """
+    try:
+        catalog = EXERCISES_PATH.read_bytes()
+    except FileNotFoundError:
+        return None
+    digest = hashlib.sha256(catalog).hexdigest()
+
+    try:
+        with open(EXERCISE_INDEX_CACHE) as f:
+            cached = json.load(f)
+        if cached.get("version") == EXERCISE_INDEX_VERSION and cached.get("digest") == digest:
+            return ExerciseIndex.from_dict(cached["index"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = ExerciseIndex(*parse_exercise_catalog(catalog.decode("utf-8").splitlines()))
+    try:
+        with atomic_write(EXERCISE_INDEX_CACHE) as f:
+            json.dump({"version": EXERCISE_INDEX_VERSION, "digest": digest, "index": index.to_dict()}, f)
+    except OSError:
+        # A read-only skill directory just means rebuilding each run
+        pass
+    return index
+
+
+def canonical_exercise(row, index):
+    """Rename a row's exercise from an alias or other casing to its catalog name."""
+    if index:
+        row["exercise"] = index.lookup(row["exercise"]) or row["exercise"]
+    return row
+
+
+def track_rows(rows, exercises, dates, index=None):
+    """Pass rows through with canonical exercise names, collecting names and dates.
+
+    Aliases are stored as the exercise they refer to, so reports and
+    personal records see "OHP" and "Overhead Press" as one lift.
+    """
+    for row in rows:
+        canonical_exercise(row, index)
+        exercises.add(row["exercise"])
+        dates.add(row["date"])
+        yield row
+
+
+def validate_exercises(unique_exercises, index):
+    """Check for unrecognized exercise names and suggest matches.
+
+    Names and aliases from the ExerciseIndex are accepted; anything else is
+    reported with the closest known exercise.
+    """
+    if not index:
+        return
+
+    unrecognized = []
+
+    for exercise in unique_exercises:
+        if index.lookup(exercise) is None:
+            suggestion = index.suggest(exercise)
+            if suggestion:
+                unrecognized.append(f"  '{exercise}' - did you mean '{suggestion}'?")
+            else:
+                unrecognized.append(f"  '{exercise}' - no close match found")
+
+    if unrecognized:
+        print("\nUnrecognized exercises:", file=sys.stderr)
+        for msg in sorted(unrecognized):
+            print(msg, file=sys.stderr)
+        print(file=sys.stderr)
+
+
+# Line classifier for workout markdown, applied to right-stripped lines:
+# a "## YYYY-MM-DD" date header, any other header, a set line ("- ..."),
+# or an exercise name.
+LINE_RE = re.compile(
+    r"(?:##\s+(?P<date>\d{4}-\d{2}-\d{2}).*"
+    r"|(?P<header>#.*)"
+    r"|\s*(?P<set>-.*)"
+    r"|\s*(?P<exercise>\S.*))"
+)
+# Set line body, after the comment and leading dash are removed:
+# a duration ("30m", "1h30m"), "weight - reps, reps", or bare reps
+SET_RE = re.compile(
+    r"(?P<duration>\d+[hm].*)"
+    r"|(?P<weight>\d+(?:\.\d+)?)\s*-\s*(?P<reps>.+)"
+)
+HOURS_RE = re.compile(r"(\d+)h")
+MINUTES_RE = re.compile(r"(\d+)m")
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def parse_duration(text):
+    """Parse duration strings like '30m', '1h', '1h30m' into minutes."""
+    text = text.strip().lower()
+    total_minutes = 0
+
+    hours_match = HOURS_RE.search(text)
+    mins_match = MINUTES_RE.search(text)
+
+    if hours_match:
+        total_minutes += int(hours_match.group(1)) * 60
+    if mins_match:
+        total_minutes += int(mins_match.group(1))
+
+    return total_minutes if total_minutes > 0 else None
+
+
+def parse_set_line(line, current_date, current_exercise, set_counter):
+    """Parse a set line and return list of row dicts (one per set)."""
+    rows = []
+
+    # Extract comment if present
+    notes = ""
+    if "//" in line:
+        line, notes = line.split("//", 1)
+        notes = notes.strip()
+
+    line = line.strip().lstrip("-").strip()
+    match = SET_RE.fullmatch(line)
+
+    # Duration (e.g., "30m", "1h30m")
+    if match and match.group("duration"):
+        rows.append({
+            "date": current_date,
+            "exercise": current_exercise,
+            "set_num": set_counter,
+            "weight": "",
+            "reps": "",
+            "duration_min": parse_duration(line),
+            "notes": notes
+        })
+        return rows, set_counter + 1
+
+    # Weight - reps pattern (e.g., "135 - 10, 10") or bare reps
+    if match:
+        weight = match.group("weight")
+        reps_part = match.group("reps")
+    else:
+        weight = ""
+        reps_part = line
+
+    # Parse comma-separated reps
+    reps_list = [r.strip() for r in reps_part.split(",") if r.strip()]
+
+    for reps in reps_list:
+        # Handle rep counts (could be just numbers)
+        if reps.isdigit():
+            rows.append({
+                "date": current_date,
+                "exercise": current_exercise,
+                "set_num": set_counter,
+                "weight": weight,
+                "reps": int(reps),
+                "duration_min": "",
+                "notes": notes if set_counter == 1 or len(reps_list) == 1 else ""
+            })
+            set_counter += 1
+
+    return rows, set_counter
+
+
+def is_date(text):
+    """Check that text is a valid YYYY-MM-DD date."""
+    if not DATE_RE.fullmatch(text):
+        return False
+    try:
+        time.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def extract_date_from_filename(filepath):
+    """Extract date from filename like 2026-01-02.md, or None if it isn't a valid date."""
+    name = Path(filepath).stem
+    if is_date(name):
+        return name
+    return None
+
+
+def iter_workout_lines(lines, current_date=None):
+    """Yield row dicts from workout markdown lines in a single pass.
+
+    Each line is classified by one match against LINE_RE, so the cost per
+    line is a single precompiled regex call regardless of its kind. Sets
+    under a header with an impossible date (e.g. 2026-01-32) are skipped
+    with a warning, since they can't be stored as dates.
+    """
+    current_exercise = None
+    set_counter = 1
+    classify = LINE_RE.match
+
+    for line in lines:
+        line = line.rstrip()
+
+        # Skip empty lines
+        if not line:
+            continue
+
+        match = classify(line)
+        kind = match.lastgroup
+
+        if kind == "set":
+            if current_date and current_exercise:
+                new_rows, set_counter = parse_set_line(
+                    match.group("set"), current_date, current_exercise, set_counter
+                )
+                yield from new_rows
+        elif kind == "exercise":
+            current_exercise = match.group("exercise")
+            set_counter = 1
+        elif kind == "date":
+            current_date = match.group("date")
+            current_exercise = None
+            if not is_date(current_date):
+                print(f"Warning: skipping sets under invalid date header '{line}'", file=sys.stderr)
+                current_date = None
+        # Other headers are skipped
+
+
+class WorkoutRows:
+    """Columnar store for parsed sets.
+
+    Strings that repeat from set to set (date, exercise, weight as written,
+    notes) are dictionary-encoded: the column holds indexes into a list of
+    distinct values. set_num, reps and duration_min live in typed arrays.
+    A set costs a few dozen bytes instead of a seven-key dict, and the store
+    pickles compactly for --jobs workers. Iterating yields the usual row
+    dicts, so it can be passed anywhere a list of rows was accepted.
+    """
+
+    ENCODED = ("date", "exercise", "weight", "notes")
+    # reps and duration_min are ints, "" when not applicable, or None
+    # (duration_min of an unparseable time); these codes stand in for them
+    EMPTY = -1
+    MISSING = -2
+
+    def __init__(self, rows=()):
+        self.values = {name: [] for name in self.ENCODED}
+        self._codes = {name: {} for name in self.ENCODED}
+        self.columns = {
+            "date": array("I"),
+            "exercise": array("I"),
+            "set_num": array("I"),
+            "weight": array("I"),
+            "reps": array("q"),
+            "duration_min": array("q"),
+            "notes": array("I"),
+        }
+        self.extend(rows)
+
+    def __getstate__(self):
+        # The value -> code maps are rebuilt from the value lists
+        return {"values": self.values, "columns": self.columns}
+
+    def __setstate__(self, state):
+        self.values = state["values"]
+        self.columns = state["columns"]
+        self._codes = {name: {v: i for i, v in enumerate(vals)} for name, vals in self.values.items()}
+
+    def __len__(self) -> int:
+        return len(self.columns["set_num"])
+
+    def _encode(self, name, value) -> int:
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.values[name])
+            self.values[name].append(value)
+        return code
+
+    def _encode_int(self, value) -> int:
+        if value is None:
+            return self.MISSING
+        if value == "":
+            return self.EMPTY
+        return int(value)
+
+    def _decode_int(self, code):
+        if code == self.MISSING:
+            return None
+        if code == self.EMPTY:
+            return ""
+        return code
+
+    def append(self, row: dict) -> None:
+        columns = self.columns
+        for name in self.ENCODED:
+            columns[name].append(self._encode(name, row[name]))
+        columns["set_num"].append(int(row["set_num"]))
+        columns["reps"].append(self._encode_int(row["reps"]))
+        columns["duration_min"].append(self._encode_int(row["duration_min"]))
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.append(row)
+
+    def distinct(self, name: str) -> list:
+        """Distinct values of a dictionary-encoded column."""
+        return list(self.values[name])
+
+    def sort(self) -> None:
+        """Sort in place by date, exercise and set number (stable, like row_sort_key)."""
+        dates = self.values["date"]
+        exercises = self.values["exercise"]
+        date_col, exercise_col, set_col = self.columns["date"], self.columns["exercise"], self.columns["set_num"]
+        order = sorted(
+            range(len(self)),
+            key=lambda i: (dates[date_col[i]], exercises[exercise_col[i]], set_col[i]),
+        )
+        for name, column in self.columns.items():
+            self.columns[name] = array(column.typecode, (column[i] for i in order))
+
+    def records(self):
+        """Yield rows as tuples in FIELDNAMES order, as csv.writer expects."""
+        values = self.values
+        decode = self._decode_int
+        for date, exercise, set_num, weight, reps, duration, notes in zip(
+            *(self.columns[name] for name in FIELDNAMES)
+        ):
+            duration = decode(duration)
+            yield (
+                values["date"][date],
+                values["exercise"][exercise],
+                set_num,
+                values["weight"][weight],
+                decode(reps),
+                "" if duration is None else duration,
+                values["notes"][notes],
+            )
+
+    def __getitem__(self, index: int) -> dict:
+        columns = self.columns
+        return {
+            "date": self.values["date"][columns["date"][index]],
+            "exercise": self.values["exercise"][columns["exercise"][index]],
+            "set_num": columns["set_num"][index],
+            "weight": self.values["weight"][columns["weight"][index]],
+            "reps": self._decode_int(columns["reps"][index]),
+            "duration_min": self._decode_int(columns["duration_min"][index]),
+            "notes": self.values["notes"][columns["notes"][index]],
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def iter_workout_file(filepath):
+    """Yield row dicts from a workout markdown file."""
+    date = extract_date_from_filename(filepath)
+    if date is None and DATE_RE.fullmatch(Path(filepath).stem):
+        print(f"Warning: {filepath} is not named after a valid date; "
+              "only sets under a '## YYYY-MM-DD' header are read", file=sys.stderr)
+    with open(filepath, "r") as f:
+        yield from iter_workout_lines(f, date)
+
+
+def parse_workout_file(filepath):
+    """Parse a workout markdown file into a WorkoutRows."""
+    return WorkoutRows(iter_workout_file(filepath))
+
+
+def workout_files(input_path):
+    """List the workout markdown files for path (file or directory), in date order."""
+    input_path = Path(input_path)
+
+    if input_path.is_file():
+        return [input_path]
+    elif input_path.is_dir():
+        return sorted(input_path.glob("????-??-??.md"))
+    else:
+        raise FileNotFoundError(f"Path not found: {input_path}")
+
+
+def iter_file_rows(files, jobs=1):
+    """Yield each file's rows, in file order, parsing on up to `jobs` processes.
+
+    Serially each file's rows are a lazy generator. With a pool, files are
+    handed out in windows so finished results never pile up far ahead of
+    the consumer, and each file's rows arrive as a WorkoutRows.
+    """
+    jobs = max(1, min(jobs, len(files)))
+    if jobs == 1:
+        for md_file in files:
+            yield iter_workout_file(md_file)
+        return
+
+    futures = lazy_import("concurrent.futures")
+    # Daily notes are tiny, so batch them to amortize inter-process overhead
+    chunksize = max(1, min(PARSE_CHUNK_SIZE, len(files) // (jobs * 4)))
+    window = jobs * chunksize * 4
+    with futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        for start in range(0, len(files), window):
+            yield from executor.map(parse_workout_file, files[start:start + window], chunksize=chunksize)
+
+
+def iter_workouts(input_path, jobs=1):
+    """Return a generator of row dicts from path (file or directory).
+
+    The path is checked immediately; files are read lazily, in date order.
+    """
+    files = workout_files(input_path)
+    return (row for rows in iter_file_rows(files, jobs) for row in rows)
+
+
+def parse_notes(notes, date=None):
+    """Parse workout markdown held in memory into a WorkoutRows.
+
+    notes is a string or an iterable of lines. Sets are dated `date` until
+    a "## YYYY-MM-DD" header sets another.
+    """
+    lines = notes.splitlines() if isinstance(notes, str) else notes
+    return WorkoutRows(iter_workout_lines(lines, date))
+
+
+def parse_workouts(input_path, jobs=1):
+    """Parse workout file(s) from path (file or directory) into a WorkoutRows."""
+    return WorkoutRows(iter_workouts(input_path, jobs))
+
+
+def row_sort_key(row):
+    """Sort key for CSV rows: date, exercise, then set number."""
+    return (row["date"], row["exercise"], int(row["set_num"]))
+
+
+@contextlib.contextmanager
+def atomic_replace(path):
+    """Yield a temporary path next to path that replaces it on success.
+
+    A failed run leaves the original file untouched.
+    """
+    path = Path(path)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield Path(tmp_path)
+        # mkstemp creates files readable only by their owner
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """Open a temporary file next to path that replaces it on success."""
+    with atomic_replace(path) as tmp_path, open(tmp_path, "w", newline="") as f:
+        yield f
+
+
+class DateIndex:
+    """Byte offset and row count of each date's rows in an output CSV.
+
+    CSVs written by parse_workout.py keep each date's rows together and in
+    date order, so the rows for a range of dates are one slice of the file,
+    found by binary search over the dates.
+    """
+
+    def __init__(self, offset=0):
+        self.dates = []
+        self.offsets = []
+        self.rows = []
+        # Offset just past the last row added
+        self.end = offset
+        self.ordered = True
+
+    def add(self, date, size):
+        """Record the next row of the file: its date and length in bytes."""
+        if not self.dates or date != self.dates[-1]:
+            if self.dates and date < self.dates[-1]:
+                self.ordered = False
+            self.dates.append(date)
+            self.offsets.append(self.end)
+            self.rows.append(0)
+        self.rows[-1] += 1
+        self.end += size
+
+    def span(self, since=None, until=None):
+        """(start offset, end offset, rows) of the dates from since to until, inclusive."""
+        first = bisect.bisect_left(self.dates, since) if since else 0
+        last = bisect.bisect_right(self.dates, until) if until else len(self.dates)
+        if first >= last:
+            return self.end, self.end, 0
+        end = self.offsets[last] if last < len(self.dates) else self.end
+        return self.offsets[first], end, sum(self.rows[first:last])
+
+    def to_dict(self) -> dict:
+        return {"dates": self.dates, "offsets": self.offsets, "rows": self.rows, "end": self.end}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DateIndex":
+        index = cls(data["end"])
+        index.dates = data["dates"]
+        index.offsets = data["offsets"]
+        index.rows = data["rows"]
+        return index
+
+
+class DateIndexedFile:
+    """Text file wrapper that builds a DateIndex of the CSV written through it.
+
+    The first write is the header; each later one is a row (csv writers
+    write a row at a time), dated by its first field.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.index = None
+
+    def write(self, text: str) -> int:
+        self.f.write(text)
+        size = len(text) if text.isascii() else len(text.encode(self.f.encoding))
+        if self.index is None:
+            self.index = DateIndex(size)
+        else:
+            self.index.add(text.partition(",")[0], size)
+        return size
+
+    def writelines(self, lines) -> None:
+        for line in lines:
+            self.write(line)
+
+
+def date_index_path(csv_path):
+    """Path of the date index sidecar for an output CSV.
+
+    The name is dot-prefixed so partitions pushed with github_sync.py
+    --sync-dir, which skips hidden files, don't upload their indexes.
+    """
+    csv_path = Path(csv_path)
+    return csv_path.parent / f".{csv_path.name}.index.json"
+
+
+def write_date_index(csv_path, index):
+    """Save the DateIndex of a just-written CSV, or remove a stale one.
+
+    The sidecar records the CSV's size and mtime, so it is ignored once
+    anything else rewrites the file. CSVs not in date order get no index.
+    """
+    path = date_index_path(csv_path)
+    if not index.ordered:
+        path.unlink(missing_ok=True)
+        return
+    stat = Path(csv_path).stat()
+    with atomic_write(path) as f:
+        json.dump({
+            "version": DATE_INDEX_VERSION,
+            "output": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "index": index.to_dict(),
+        }, f)
+
+
+def scan_date_index(csv_path):
+    """Build the DateIndex of an existing CSV in one pass over its lines."""
+    with open(csv_path, "rb") as f:
+        index = DateIndex(len(f.readline()))
+        for line in f:
+            index.add(line[:line.find(b",")].decode("ascii", "replace"), len(line))
+    return index
+
+
+def load_date_index(csv_path):
+    """DateIndex for an output CSV from its sidecar, rebuilt if missing or stale.
+
+    Returns None if the CSV is not in date order.
+    """
+    stat = Path(csv_path).stat()
+    try:
+        with open(date_index_path(csv_path)) as f:
+            cached = json.load(f)
+        if (cached.get("version") == DATE_INDEX_VERSION
+                and cached.get("output") == {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}):
+            return DateIndex.from_dict(cached["index"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = scan_date_index(csv_path)
+    try:
+        write_date_index(csv_path, index)
+    except OSError:
+        # Next time rebuilds it again
+        pass
+    return index if index.ordered else None
+
+
+def iter_date_range(csv_path, since=None, until=None):
+    """Yield the raw bytes of a CSV's rows dated since..until, inclusive.
+
+    With a date index this seeks straight to the range and reads only its
+    bytes; a CSV not in date order is scanned line by line instead.
+    """
+    index = load_date_index(csv_path)
+    with open(csv_path, "rb") as f:
+        if index is None:
+            f.readline()
+            for line in f:
+                date = line[:line.find(b",")].decode("ascii", "replace")
+                if (not since or date >= since) and (not until or date <= until):
+                    yield line
+            return
+
+        start, end, _ = index.span(since, until)
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_files(output_path, since=None, until=None):
+    """Output CSVs that can hold dates since..until: the CSV, or its monthly partitions."""
+    output_path = Path(output_path)
+    if not output_path.is_dir():
+        return [output_path]
+    return [
+        path for path in sorted(output_path.glob(PARTITION_GLOB))
+        if (not since or path.stem >= since[:7]) and (not until or path.stem <= until[:7])
+    ]
+
+
+def write_date_range(output_path, out, since=None, until=None):
+    """Write a CSV of the output's rows dated since..until to binary file out."""
+    out.write((",".join(FIELDNAMES) + "\r\n").encode("ascii"))
+    for path in range_files(output_path, since, until):
+        for chunk in iter_date_range(path, since, until):
+            out.write(chunk)
+
+
+def write_csv(rows, output_path):
+    """Stream rows into a CSV file and return how many were written.
+
+    A WorkoutRows is written straight from its columns; any other iterable
+    of row dicts goes through csv.DictWriter. The CSV's date index is
+    written alongside it.
+    """
+    with atomic_write(output_path) as f:
+        out = DateIndexedFile(f)
+        if isinstance(rows, WorkoutRows):
+            writer = csv.writer(out)
+            writer.writerow(FIELDNAMES)
+            writer.writerows(rows.records())
+            count = len(rows)
+        else:
+            count = 0
+            writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    write_date_index(output_path, out.index)
+    return count
+
+
+def iter_sorted_by_date(rows):
+    """Sort date-ordered rows by row_sort_key, holding one date at a time.
+
+    Raises ValueError if a date is lower than one already seen.
+    """
+    previous = ""
+    for day, group in itertools.groupby(rows, key=lambda r: r["date"]):
+        if day < previous:
+            raise ValueError(f"rows out of date order at {day}")
+        previous = day
+        yield from sorted(group, key=row_sort_key)
+
+
+def update_csv(csv_path, new_rows):
+    """Update CSV by replacing rows for dates in new_rows, keeping other dates.
+
+    The existing file is streamed and merged with the sorted new rows, so
+    memory grows with the rows being replaced rather than the whole history.
+    Returns the number of new rows.
+    """
+    new_rows = WorkoutRows(new_rows)
+    new_rows.sort()
+    dates_to_replace = set(new_rows.distinct("date"))
+
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        write_csv(new_rows, csv_path)
+        return len(new_rows)
+
+    def existing_rows(f):
+        return (row for row in csv.DictReader(f) if row["date"] not in dates_to_replace)
+
+    # Files written by parse_workout.py are in date order; anything else is
+    # sorted in memory as before
+    try:
+        with open(csv_path, newline="") as f:
+            write_csv(heapq.merge(iter_sorted_by_date(existing_rows(f)), new_rows, key=row_sort_key), csv_path)
+    except ValueError:
+        with open(csv_path, newline="") as f:
+            existing = sorted(existing_rows(f), key=row_sort_key)
+        write_csv(heapq.merge(existing, new_rows, key=row_sort_key), csv_path)
+    return len(new_rows)
+
+
+def partition_month(row):
+    """Partition a row belongs to: the YYYY-MM of its date."""
+    return row["date"][:7]
+
+
+def write_partitions(rows, directory):
+    """Stream rows into monthly YYYY-MM.csv partitions and return the count.
+
+    Partitions are built in a scratch directory and then moved into place,
+    replacing the previous ones; months no longer present are removed.
+    Within a partition, rows keep the order they arrived in. Each partition
+    gets its date index, like any other CSV written here.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    scratch = Path(tempfile.mkdtemp(dir=directory, prefix=".write."))
+    count = 0
+    indexes = {}
+
+    try:
+        # Rows arrive in date order, so each partition is usually written in one go
+        for month, group in itertools.groupby(rows, key=partition_month):
+            path = scratch / f"{month}.csv"
+            is_new = not path.exists()
+            with open(path, "a", newline="") as f:
+                out = DateIndexedFile(f)
+                out.index = indexes.get(month)
+                writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+                if is_new:
+                    writer.writeheader()
+                for row in group:
+                    writer.writerow(row)
+                    count += 1
+                indexes[month] = out.index
+
+        for stale in directory.glob(PARTITION_GLOB):
+            if not (scratch / stale.name).exists():
+                stale.unlink()
+                date_index_path(stale).unlink(missing_ok=True)
+        for month, index in indexes.items():
+            os.replace(scratch / f"{month}.csv", directory / f"{month}.csv")
+            write_date_index(directory / f"{month}.csv", index)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return count
+
+
+def update_partitions(directory, new_rows):
+    """Replace rows for the dates in new_rows, rewriting only their months.
+
+    Returns the number of new rows.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    new_rows = WorkoutRows(new_rows)
+    new_rows.sort()
+
+    for month, group in itertools.groupby(new_rows, key=partition_month):
+        update_csv(directory / f"{month}.csv", list(group))
+    return len(new_rows)
+
+
+def write_output(rows, output_path, fmt="csv", append=False, partition=False):
+    """Write rows to a CSV, a directory of monthly partitions, or Parquet.
+
+    With append, rows replace those for their dates and other dates are
+    kept. An existing output directory is treated as partitioned. Returns
+    the number of rows written.
+    """
+    partition = partition or Path(output_path).is_dir()
+    if fmt == "parquet":
+        write, update = write_parquet, update_parquet
+    elif partition:
+        write, update = write_partitions, update_partitions
+    else:
+        write, update = write_csv, update_csv
+    return update(output_path, rows) if append else write(rows, output_path)
+
+
+def manifest_path(output_path):
+    """Path of the incremental-parse manifest for an output CSV.
+
+    Dot-prefixed like the date index, so it isn't pushed by --sync-dir;
+    it records the absolute local input path.
+    """
+    output_path = Path(output_path)
+    return output_path.parent / f".{output_path.name}.manifest.json"
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(input_path, output_path):
+    """Load the manifest for output_path if it still describes that file.
+
+    Returns None when there is no manifest, it was built from another input,
+    or the CSV has been written since (e.g. by --append or a full run).
+    """
+    try:
+        with open(manifest_path(output_path)) as f:
+            manifest = json.load(f)
+        stat = Path(output_path).stat()
+    except (OSError, ValueError):
+        return None
+
+    if (manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("input") != str(Path(input_path).resolve())
+            or manifest.get("output") != {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}):
+        return None
+    return manifest
+
+
+def write_incremental(input_path, output_path, exercises, jobs=1, index=None):
+    """Re-parse only new or changed files and splice their rows into the CSV.
+
+    The CSV holds each source file's rows as one block, in file order, and
+    the manifest records every file's mtime, size, hash and row count.
+    Unchanged blocks are copied line for line from the previous CSV (fields
+    never contain newlines, since they come from single markdown lines),
+    blocks of deleted files are dropped, and changed files are parsed anew.
+    Changed files are parsed on up to `jobs` processes. Exercise names from
+    parsed files are mapped to their catalog names through index and added
+    to exercises; if the catalog changed, every file is parsed again.
+
+    Returns (rows written, files parsed, total files).
+    """
+    files = workout_files(input_path)
+    manifest = load_manifest(input_path, output_path)
+    catalog = file_digest(EXERCISES_PATH) if index else None
+    previous = manifest["files"] if manifest and manifest.get("catalog") == catalog else {}
+
+    entries = {}
+    changed = set()
+    for md_file in files:
+        stat = md_file.stat()
+        entry = previous.get(md_file.name)
+        if entry and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            entries[md_file.name] = entry
+            continue
+        digest = file_digest(md_file)
+        if not entry or entry["sha256"] != digest:
+            changed.add(md_file.name)
+        # A touched but unmodified file keeps its rows under the new mtime
+        entries[md_file.name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "rows": entry["rows"] if entry else 0,
+        }
+
+    parsed = iter_file_rows([md_file for md_file in files if md_file.name in changed], jobs)
+    count = 0
+    old_csv = open(output_path, newline="") if previous else None
+    try:
+        if old_csv:
+            old_csv.readline()
+        # Previous blocks, in the order they appear in the old CSV
+        old_blocks = iter(previous.items())
+
+        with atomic_write(output_path) as f:
+            out = DateIndexedFile(f)
+            writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            for md_file in files:
+                name = md_file.name
+                if name in changed:
+                    rows = 0
+                    for row in next(parsed):
+                        canonical_exercise(row, index)
+                        exercises.add(row["exercise"])
+                        writer.writerow(row)
+                        rows += 1
+                    entries[name]["rows"] = rows
+                    count += rows
+                    continue
+
+                # Skip blocks of deleted or changed files until this one
+                for old_name, old_entry in old_blocks:
+                    lines = itertools.islice(old_csv, old_entry["rows"])
+                    if old_name == name:
+                        out.writelines(lines)
+                        break
+                    for _ in lines:
+                        pass
+                count += entries[name]["rows"]
+    finally:
+        parsed.close()
+        if old_csv:
+            old_csv.close()
+
+    write_date_index(output_path, out.index)
+    stat = Path(output_path).stat()
+    with atomic_write(manifest_path(output_path)) as f:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "input": str(Path(input_path).resolve()),
+            "catalog": catalog,
+            "output": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+            "files": entries,
+        }, f, indent=1)
+        f.write("\n")
+
+    return count, len(changed), len(files)
+
+
+def import_duckdb():
+    """Import duckdb, exiting with a hint if it is not installed."""
+    try:
+        return lazy_import("duckdb")
+    except ImportError:
+        print("Error: duckdb not installed. Run script with: uv run parse_workout.py", file=sys.stderr)
+        sys.exit(1)
+
+
+def sql_string(value):
+    """Quote a value as a SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def typed_csv_source(csv_path):
+    """DuckDB table expression reading an output CSV with COLUMN_TYPES."""
+    columns = ", ".join(f"{sql_string(name)}: {sql_string(kind)}" for name, kind in COLUMN_TYPES.items())
+    return (f"read_csv({sql_string(csv_path)}, header=true, columns={{{columns}}}, "
+            "force_not_null=['exercise', 'notes'])")
+
+
+def copy_to_parquet(duckdb, select, path):
+    """Write the rows of a SELECT to a Parquet file, sorted by PARQUET_ORDER."""
+    with duckdb.connect() as con:
+        con.execute(f"COPY ({select} ORDER BY {PARQUET_ORDER}) TO {sql_string(path)} "
+                    "(FORMAT parquet, COMPRESSION zstd)")
+
+
+def write_parquet(rows, output_path):
+    """Write rows to a typed Parquet file sorted by date; return the count.
+
+    Rows are staged through a temporary CSV so DuckDB does the typing and
+    sorting out of core, and exercise names get dictionary-encoded.
+    """
+    duckdb = import_duckdb()
+    output_path = Path(output_path)
+
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+        staging = Path(tmp) / "rows.csv"
+        count = write_csv(rows, staging)
+        with atomic_replace(output_path) as tmp_path:
+            copy_to_parquet(duckdb, f"SELECT * FROM {typed_csv_source(staging)}", tmp_path)
+    return count
+
+
+def update_parquet(output_path, new_rows):
+    """Update a Parquet file by replacing rows for dates in new_rows.
+
+    Returns the number of new rows.
+    """
+    output_path = Path(output_path)
+    if not output_path.exists():
+        return write_parquet(new_rows, output_path)
+
+    duckdb = import_duckdb()
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+        staging = Path(tmp) / "rows.csv"
+        count = write_csv(new_rows, staging)
+        new = typed_csv_source(staging)
+        select = (f"SELECT * FROM read_parquet({sql_string(output_path)}) "
+                  f"WHERE date NOT IN (SELECT date FROM {new}) "
+                  f"UNION ALL SELECT * FROM {new}")
+        with atomic_replace(output_path) as tmp_path:
+            copy_to_parquet(duckdb, select, tmp_path)
+    return count
+
+
+def output_source(output_path):
+    """DuckDB table expression reading the output as COLUMN_TYPES rows.
+
+    Handles a CSV file, a directory of monthly partitions, or Parquet.
+    """
+    output_path = Path(output_path)
+    if output_path.is_dir():
+        return typed_csv_source(output_path / PARTITION_GLOB)
+    if is_parquet(output_path):
+        return f"read_parquet({sql_string(output_path)})"
+    return typed_csv_source(output_path)
+
+
+def update_db(db_path, output_path, dates=None):
+    """Load the written output into the workouts table of a DuckDB file.
+
+    With dates, only rows for those dates are replaced; otherwise, or if
+    the table is new or empty (e.g. a first --append --db), it is reloaded
+    in full so it matches the output. The SUMMARY_TABLES are rebuilt in the same transaction, so
+    later queries read precomputed results instead of rescanning the output.
+    """
+    duckdb = import_duckdb()
+    source = output_source(output_path)
+    columns = ", ".join(f"{name} {kind}" for name, kind in COLUMN_TYPES.items())
+
+    with duckdb.connect(str(db_path)) as con:
+        con.execute("BEGIN")
+        con.execute(f"CREATE TABLE IF NOT EXISTS workouts ({columns})")
+        if dates is not None and not con.execute("SELECT 1 FROM workouts LIMIT 1").fetchone():
+            dates = None
+        if dates is None:
+            con.execute("DELETE FROM workouts")
+            con.execute(f"INSERT INTO workouts SELECT * FROM {source}")
+        else:
+            dates = sorted(dates)
+            con.execute("DELETE FROM workouts WHERE date IN (SELECT unnest(?::DATE[]))", [dates])
+            con.execute(f"INSERT INTO workouts SELECT * FROM {source} "
+                        "WHERE date IN (SELECT unnest(?::DATE[]))", [dates])
+        for name, select in SUMMARY_TABLES.items():
+            con.execute(f"CREATE OR REPLACE TABLE {name} AS {select}")
+        con.execute("COMMIT")
+
+
+def is_parquet(path):
+    """Check for the Parquet magic number at the start of a file."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == b"PAR1"
+    except OSError:
+        return False
+
+
+def date_filter(since=None, until=None):
+    """SQL condition selecting dates from since to until, inclusive."""
+    bounds = []
+    if since:
+        bounds.append(f"date >= DATE {sql_string(since)}")
+    if until:
+        bounds.append(f"date <= DATE {sql_string(until)}")
+    return " AND ".join(bounds) or "true"
+
+
+def connect_workouts(output_path, db_path=None, since=None, until=None):
+    """Open a DuckDB connection with the output bound as a `workouts` relation.
+
+    CSV output is loaded into a temporary table in one scan, so queries
+    that reference it several times don't re-parse the file; Parquet stays
+    a view so filters and column selection are pushed down into the file.
+    A --db database is opened read-only and uses its own table.
+
+    With since and/or until, `workouts` holds only those dates; CSV output
+    loads just that slice of the file, found through its date index.
+    """
+    duckdb = import_duckdb()
+
+    source = db_path or output_path
+    if not Path(source).exists():
+        print(f"Error: {source} not found", file=sys.stderr)
+        sys.exit(1)
+
+    ranged = bool(since or until)
+    if db_path:
+        con = duckdb.connect(str(db_path), read_only=True)
+        if ranged:
+            # A temporary view shadows the database's own table
+            catalog = con.execute("SELECT current_database()").fetchone()[0].replace('"', '""')
+            con.execute(f'CREATE TEMP VIEW workouts AS SELECT * FROM "{catalog}".main.workouts '
+                        f"WHERE {date_filter(since, until)}")
+        return con
+
+    con = duckdb.connect()
+    if is_parquet(output_path):
+        con.execute(f"CREATE VIEW workouts AS SELECT * FROM {output_source(output_path)} "
+                    f"WHERE {date_filter(since, until)}")
+    elif ranged:
+        with tempfile.TemporaryDirectory() as tmp:
+            staging = Path(tmp) / "range.csv"
+            with open(staging, "wb") as f:
+                write_date_range(output_path, f, since, until)
+            con.execute(f"CREATE TEMP TABLE workouts AS SELECT * FROM {typed_csv_source(staging)}")
+    else:
+        con.execute(f"CREATE TEMP TABLE workouts AS SELECT * FROM {output_source(output_path)}")
+    return con
+
+
+def run_query(output_path, query, db_path=None, since=None, until=None):
+    """Run a DuckDB query against the output, or a --db database.
+
+    The output is bound to a `workouts` relation with COLUMN_TYPES (see
+    connect_workouts) rather than substituted into the query text.
+    """
+    with connect_workouts(output_path, db_path, since, until) as con:
+        print(con.sql(query))
+
+
+def run_reports(output_path, names, db_path=None, since=None, until=None):
+    """Print the named REPORTS, all computed from a single scan of the data.
+
+    The scan covers the whole history; since and until only limit which
+    rows of each report are printed.
+    """
+    window = {
+        "since": f"DATE {sql_string(since or '-infinity')}",
+        "until": f"DATE {sql_string(until or 'infinity')}",
+    }
+    with connect_workouts(output_path, db_path) as con:
+        con.execute(f"CREATE TEMP TABLE daily AS {DAILY_SQL}")
+        for name in names:
+            title, select = REPORTS[name]
+            print(f"{title}:")
+            print(con.sql(select.format(**window)))
+
+
+def print_date_range(output_path, since=None, until=None, db_path=None):
+    """Print the rows dated since..until as CSV.
+
+    CSV output streams straight from the file's date range; Parquet and a
+    --db database go through DuckDB.
+    """
+    if not Path(db_path or output_path).exists():
+        print(f"Error: {db_path or output_path} not found", file=sys.stderr)
+        sys.exit(1)
+
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    if db_path or is_parquet(output_path):
+        with connect_workouts(output_path, db_path, since, until) as con, \
+                tempfile.TemporaryDirectory() as tmp:
+            staging = Path(tmp) / "range.csv"
+            con.execute(f"COPY (SELECT * FROM workouts ORDER BY {PARQUET_ORDER}) "
+                        f"TO {sql_string(staging)} (HEADER)")
+            with open(staging, "rb") as f:
+                shutil.copyfileobj(f, out)
+    else:
+        write_date_range(output_path, out, since, until)
+    out.flush()